@@ -35,6 +35,16 @@ class NotSelectable(StoreException):
         super().__init__(f'object not selectable: {value}')
 
 
+class NotWritable(StoreException):
+    """
+    Exception raised when trying to write to a store through a read-only
+    transaction.
+    """
+
+    def __init__(self, method: Text) -> None:
+        super().__init__(f'cannot {method} in a read-only transaction')
+
+
 class NotOrderable(StoreException):
     """
     Exception raised when a type that cannot be sorted is used in an query's
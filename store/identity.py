@@ -0,0 +1,47 @@
+"""
+class LRUIdentityMap
+"""
+
+from collections import OrderedDict
+from typing import Any
+
+
+class LRUIdentityMap(OrderedDict):
+    """
+    A bounded alternative to the WeakValueDictionary that stores use as their
+    identity map by default. It holds strong references to the most recently
+    used StateDicts, evicting the least recently used beyond `capacity`. This
+    avoids the weakref bookkeeping on each access and keeps short-lived
+    StateDicts cached between reads. A capacity of 0 disables the identity map
+    altogether, so that a new StateDict is built on each read.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        super().__init__()
+        self.capacity = capacity
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """
+        Return the cached StateDict, marking it as most recently used.
+        """
+        value = super().get(key, default)
+        if value is not default:
+            try:
+                self.move_to_end(key)
+            except KeyError:
+                # evicted by another thread in the meantime
+                pass
+        return value
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        """
+        Cache the StateDict, evicting the least recently used if need be.
+        """
+        if self.capacity <= 0:
+            return
+
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+
+        if len(self) > self.capacity:
+            self.popitem(last=False)
@@ -2,8 +2,10 @@
 Indexer is an internal class, used by Store.
 """
 
+import bisect
+
 from collections import defaultdict
-from typing import Dict, Optional, Iterable, Text
+from typing import Any, Dict, Optional, Iterable, List, Text
 
 from BTrees.OOBTree import BTree # type: ignore
 
@@ -11,108 +13,294 @@ from .util import get_hashable
 from .exceptions import NotHashable
 
 
+class HashIndex(dict):
+    """
+    A dict-based alternative to BTree indices. Inserts, removals and equality
+    lookups are O(1), but range queries require sorting its keys, so it's
+    best suited to keys only ever queried by equality or containment. The
+    sorted keys are cached between range queries until a key is added or
+    removed.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._sorted_keys: Optional[List] = None
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        if key not in self:
+            self._sorted_keys = None
+        super().__setitem__(key, value)
+
+    def __delitem__(self, key: Any) -> None:
+        super().__delitem__(key)
+        self._sorted_keys = None
+
+    def pop(self, *args) -> Any:
+        self._sorted_keys = None
+        return super().pop(*args)
+
+    def popitem(self) -> Any:
+        self._sorted_keys = None
+        return super().popitem()
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        self._sorted_keys = None
+        return super().setdefault(key, default)
+
+    def update(self, *args, **kwargs) -> None:
+        self._sorted_keys = None
+        super().update(*args, **kwargs)
+
+    def clear(self) -> None:
+        self._sorted_keys = None
+        super().clear()
+
+    @property
+    def sorted_keys(self) -> List:
+        """
+        Return the non-null keys of the index in sorted order.
+        """
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(k for k in self if k is not None)
+        return self._sorted_keys
+
+    def values(
+        self,
+        min: Any = None,
+        max: Any = None,
+        excludemin: bool = False,
+        excludemax: bool = False,
+    ) -> List:
+        """
+        Return values in key order, optionally bounded by min and max, with
+        the same semantics as BTree.values.
+        """
+        keys = self.sorted_keys
+        lower = 0
+        upper = len(keys)
+        if min is not None:
+            find = bisect.bisect_right if excludemin else bisect.bisect_left
+            lower = find(keys, min)
+        if max is not None:
+            find = bisect.bisect_left if excludemax else bisect.bisect_right
+            upper = find(keys, max)
+
+        values = [self[k] for k in keys[lower:upper]]
+
+        # like BTree, sort None before everything else
+        if min is None and None in self:
+            values.insert(0, self[None])
+
+        return values
+
+
 class Indexer:
     """
     Manages access to B-tree indices for each scalar field of stored records.
     """
 
+    index_types = {'btree': BTree, 'hash': HashIndex}
+
     def __init__(self, pkey: Text):
         self.pkey_name = pkey
-        self.keys = defaultdict(set)  # map from pkey to set of indexed dict keys
-        self.indices = {}             # BTree indices
+        self.keys = defaultdict(dict) # map from pkey to indexed keys & values
+        self.indices = {}             # BTree (or HashIndex) indices
+        self.kinds = {}               # map from key to non-default index kind
+
+    def clear(self):
+        """
+        Remove all indexed data, retaining the index kind of each key.
+        """
+        self.keys.clear()
+        self.indices.clear()
+
+    def create_index(self, key: Text, kind: Text = 'btree'):
+        """
+        Set the kind of index used for the given key, either "btree" or
+        "hash", rebuilding its index if it already exists.
+        """
+        if kind not in self.index_types:
+            raise ValueError(f'unrecognized index kind: {kind}')
+
+        self.kinds[key] = kind
+
+        index = self.indices.get(key)
+        if index is not None:
+            new_index = self.index_types[kind]()
+            for value, pkeys in index.items():
+                new_index[value] = pkeys
+            self.indices[key] = new_index
+
+    def get_index(self, key: Text) -> Any:
+        """
+        Return the index of the given key, lazily creating it.
+        """
+        index = self.indices.get(key)
+        if index is None:
+            kind = self.kinds.get(key, 'btree')
+            index = self.indices[key] = self.index_types[kind]()
+        return index
+
+    @staticmethod
+    def _add_to_index(index: Any, value: Any, pkey: Any):
+        """
+        Add the given primary key to the entry of the given (hashable) value
+        in the given index.
+        """
+        bucket = index.get(value)
+        if bucket is None:
+            bucket = index[value] = set()
+        bucket.add(pkey)
 
     def insert(self, record: Dict, keys: Iterable[Text]):
         """
         Add the primary key of the given record to the keyed indices.
         """
-        keys = set(keys) if not isinstance(keys, set) else keys
-
         pkey = record[self.pkey_name]
 
-        # record dict keys we're inserting in indices
-        self.keys[pkey] |= keys
+        # hashable values of the dict keys we're inserting in indices. these
+        # are retained so that the entries can later be removed without
+        # requiring a snapshot of the record's old state.
+        values = self.keys[pkey]
 
         # insert in indices
         key = None
         try:
             for key in keys:
                 value = get_hashable(record.get(key))
+                values[key] = value
+                self._add_to_index(self.get_index(key), value, pkey)
 
-                # lazy create index
-                if key not in self.indices:
-                    self.indices[key] = BTree()
-
-                # insert value in index
-                index = self.indices[key]
-                if value not in index:
-                    index[value] = set()
+        except NotHashable as exc:
+            raise NotHashable(exc.value, key) from exc
 
-                index[value].add(pkey)
+    def insert_many(self, records: Iterable[Dict]):
+        """
+        Add the primary keys of the given records to the indices of all their
+        keys. Values are grouped by key first, so that each index is fetched
+        once per batch rather than once per record.
+        """
+        pkey_name = self.pkey_name
+        columns = defaultdict(list)  # map from key to (value, pkey) pairs
 
+        key = None
+        try:
+            for record in records:
+                pkey = record[pkey_name]
+                values = self.keys[pkey]
+                for key, value in record.items():
+                    value = get_hashable(value)
+                    values[key] = value
+                    columns[key].append((value, pkey))
         except NotHashable as exc:
             raise NotHashable(exc.value, key) from exc
 
+        for key, pairs in columns.items():
+            index = self.get_index(key)
+
+            # insert values in index, inlining _add_to_index for the batch
+            for value, pkey in pairs:
+                bucket = index.get(value)
+                if bucket is None:
+                    bucket = index[value] = set()
+                bucket.add(pkey)
+
     def remove(self, record: Dict, keys: Optional[Iterable[Text]] = None):
         """
         Remove the primary key of the given record from the keyed indices.
         """
         pkey = record[self.pkey_name]
-        keys = keys if isinstance(keys, set) else set(keys or [])
-        keys = (keys or self.keys.get(pkey).copy())
-
-        # remove keys from key map set and delete row
-        # from keys map if no more keys
-        if keys:
-            self.keys[pkey] -= keys
-
-            # remove entries in B-tree indices
-            key = None
-            try:
-                for key in keys:
-                    # lazy create index
-                    if key not in self.indices:
-                        continue
+        values = self.keys.get(pkey)
+        if values is None:
+            return
 
-                    index = self.indices[key]
-                    value = get_hashable(record[key])
+        # remove entries in B-tree indices for the given keys (or all of them)
+        # and drop these keys from the keys map
+        for key in (list(values) if keys is None else keys):
+            if key in values:
+                self.discard(pkey, key, values.pop(key))
 
-                    pkey_set = index.get(value)
-                    if not pkey_set:
-                        continue
+        # if all keys removed from all indices,
+        # remove row in keys dict
+        if not values:
+            del self.keys[pkey]
+
+    def remove_many(self, records: Iterable[Dict]):
+        """
+        Remove the primary keys of the given records from all indices. Like
+        insert_many, entries are grouped by key first, so that each index is
+        visited once per batch rather than once per record.
+        """
+        pkey_name = self.pkey_name
+        columns = defaultdict(list)  # map from key to (value, pkey) pairs
+
+        for record in records:
+            pkey = record[pkey_name]
+            values = self.keys.pop(pkey, None)
+            if values:
+                for key, value in values.items():
+                    columns[key].append((value, pkey))
 
-                    pkey_set.discard(pkey)
+        indices = self.indices
+        for key, pairs in columns.items():
+            index = indices.get(key)
+            if index is None:
+                continue
 
-                    if not index[value]:
+            for value, pkey in pairs:
+                bucket = index.get(value)
+                if bucket:
+                    bucket.discard(pkey)
+                    if not bucket:
                         del index[value]
-                    if not index:
-                        del self.indices[key]
 
-            except NotHashable as exc:
-                raise NotHashable(exc.value, key) from exc
+            if not index:
+                del indices[key]
 
-        # if all keys removed from all indices,
-        # remove row in keys dict
-        if not self.keys[pkey]:
-            del self.keys[pkey]
-        
-    def update(self, old_state: Dict, record: Dict, keys: Iterable[Text]):
+    def discard(self, pkey: Any, key: Text, value: Any):
+        """
+        Remove the given primary key from the entry of the given (hashable)
+        value in the index of the given key. This doesn't touch the keys map.
+        """
+        index = self.indices.get(key)
+        if index is None:
+            return
+
+        pkey_set = index.get(value)
+        if not pkey_set:
+            return
+
+        pkey_set.discard(pkey)
+
+        if not pkey_set:
+            del index[value]
+        if not index:
+            del self.indices[key]
+
+    def update(self, record: Dict, keys: Iterable[Text]):
         """
-        Update indices based on how values have changed between old and new
-        copies of an updated record.
+        Update indices based on how values have changed for the given keys.
+        Stale entries are located using the values retained in the keys map,
+        so no copy of the pre-updated record is needed. Keys whose values
+        haven't changed are left alone.
         """
-        keys = keys if isinstance(keys, set) else set(keys)
         pkey = record[self.pkey_name]
+        values = self.keys[pkey]
 
-        # keys for which indices need to be updated:
-        stale_keys = self.keys[pkey] & keys
+        key = None
+        try:
+            for key in keys:
+                value = get_hashable(record.get(key))
+                if key in values:
+                    old_value = values[key]
+                    if old_value == value:
+                        continue
 
-        # keys that are not yet indexed:
-        new_keys = keys - self.keys[pkey]
+                    # remove the stale index entry
+                    self.discard(pkey, key, old_value)
 
-        # update stale indices
-        if stale_keys:
-            self.remove(old_state, stale_keys)
-            self.insert(record, stale_keys)
+                values[key] = value
+                self._add_to_index(self.get_index(key), value, pkey)
 
-        # insert new indices
-        self.insert(record, new_keys)
\ No newline at end of file
+        except NotHashable as exc:
+            raise NotHashable(exc.value, key) from exc
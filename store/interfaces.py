@@ -4,7 +4,7 @@ Public Interface classes for internal components
 
 from threading import RLock
 from typing import (
-    Any, Dict, Optional, Set, OrderedDict,
+    Any, Dict, Optional, Set,
     Iterable, Text, Type, Union, Callable,
 )
 
@@ -38,6 +38,8 @@ class OrderingInterface:
 
 class SymbolicAttributeInterface:
 
+    __slots__ = ()
+
     key: Text
 
     def __init__(self, *args, **kwargs) -> None:
@@ -138,7 +140,7 @@ class TransactionInterface:
     def create(self, record: Dict) -> StateDictInterface:
         raise NotImplementedError()
     
-    def create_many(self, records: Iterable[Any]) -> OrderedDict[Any, StateDictInterface]:
+    def create_many(self, records: Iterable[Any]) -> Dict[Any, StateDictInterface]:
         raise NotImplementedError()
 
     def select(self, *targets: Union[SymbolicAttributeInterface, Text]) -> QueryInterface:
@@ -147,14 +149,14 @@ class TransactionInterface:
     def get(self, target: Any) -> Optional[StateDictInterface]:
         raise NotImplementedError()
 
-    def get_many(self, targets: Iterable[Any]) -> OrderedDict[Any, StateDictInterface]:
+    def get_many(self, targets: Iterable[Any]) -> Dict[Any, StateDictInterface]:
         raise NotImplementedError()
 
     def update(self, target: Any, keys: Optional[Set] = None) -> StateDictInterface:
         raise NotImplementedError()
 
     def update_many(
-        self, targets: Iterable[Dict]) -> OrderedDict[Any, StateDictInterface]:
+        self, targets: Iterable[Dict]) -> Dict[Any, StateDictInterface]:
         raise NotImplementedError()
 
     def delete(
@@ -170,7 +172,10 @@ class TransactionInterface:
 
 class StoreInterface:
 
+    __slots__ = ()
+
     pkey_name: Text
+    dict_type: Type[StateDictInterface]
     row: SymbolicAttributeInterface
     records: Dict[Text, Dict]
     lock: RLock
@@ -186,7 +191,7 @@ class StoreInterface:
         raise NotImplementedError()
 
     def transaction(
-        self, callback: Optional[Callable] = None
+        self, callback: Optional[Callable] = None, read_only: bool = False
     ) -> TransactionInterface:
         raise NotImplementedError()
 
@@ -205,7 +210,7 @@ class StoreInterface:
     def get_many(
         self,
         targets: Optional[Iterable[Any]] = None,
-    ) -> OrderedDict[Any, StateDictInterface]:
+    ) -> Dict[Any, StateDictInterface]:
         raise NotImplementedError()
 
     def create(
@@ -219,7 +224,7 @@ class StoreInterface:
         self,
         targets: Iterable[Any],
         transaction: Optional[TransactionInterface] = None
-    ) -> OrderedDict[Any, StateDictInterface]:
+    ) -> Dict[Any, StateDictInterface]:
         raise NotImplementedError()
 
     def update(
@@ -234,7 +239,7 @@ class StoreInterface:
         self,
         targets: Iterable[Any],
         transaction: Optional[TransactionInterface] = None
-    ) -> OrderedDict[Any, StateDictInterface]:
+    ) -> Dict[Any, StateDictInterface]:
         raise NotImplementedError()
 
     def delete(
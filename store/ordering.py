@@ -2,12 +2,38 @@
 class Ordering
 """
 
-from datetime import datetime, timedelta, date
+from operator import itemgetter
 from store.util import get_hashable
-from typing import Iterable, List, Dict, Sequence
+from typing import Any, Iterable, List, Dict, Sequence
 
 from .interfaces import StateDictInterface, OrderingInterface
-from .exceptions import NotOrderable
+
+
+# functions for converting types that are not inherently sortable to a form
+# that is
+CONVERTERS = {
+    dict: get_hashable,
+    set: get_hashable,
+    tuple: get_hashable,
+}
+
+
+class _Reversed:
+    """
+    Wraps a value in a sort key, inverting its order, so that descending keys
+    can be sorted along with ascending ones in a single pass.
+    """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+    def __lt__(self, other: '_Reversed') -> bool:
+        return other.value < self.value
+
+    def __eq__(self, other: '_Reversed') -> bool:
+        return self.value == other.value
 
 
 class Ordering(OrderingInterface):
@@ -34,47 +60,42 @@ class Ordering(OrderingInterface):
         if len(orderings) == 1:
             key = orderings[0].attr.key
             reverse = orderings[0].desc
-            return sorted(records, key=lambda x: x[key], reverse=reverse)
-
-        # create functions for converting types that are not inherently
-        # sortable to an integer value (which is sortable)
-        converters = {
-            bytes: lambda x: int.from_bytes(x, byteorder='big'),
-            datetime: lambda x: x.timestamp(),
-            timedelta: lambda x: x.total_seconds(),
-            date: lambda x: x.toordinal(),
-            dict: get_hashable,
-            set: get_hashable,
-            tuple: get_hashable,
-        }
-
-        # pre-compute the "index" keys by which the records shall be sorted.
-        # Each index is an array of ints.
-        indexes = {}
-        for record in records:
-            index = []
-            for ordering in orderings:
-                key = ordering.attr.key
-                value = record.get(key)
-                if value is None:
-                    value = 0
-                if ordering.desc:
-                    if isinstance(value, str):
-                        max_unicode_value = 0x10FFFF
-                        inverses = [max_unicode_value - ord(c) for c in value]
-                        inverse_value = ''.join(chr(i) for i in inverses)
-                        index.append(inverse_value)
-                    else:
-                        convert = converters.get(type(value))
-                        if convert:
-                            value = convert(value)
-                            index.append(-1 * value)
-                        else:
-                            raise NotOrderable(key, value)
-                else:
-                    index.append(value)
-
-            indexes[record] = tuple(index)
-
-        # now that we have indexes dict, do the sort!
-        return sorted(records, key=lambda x: indexes[x])
\ No newline at end of file
+            return sorted(records, key=itemgetter(key), reverse=reverse)
+
+        records = list(records)
+
+        # pre-compute the "index" keys by which the records shall be sorted,
+        # one column of values per ordering, converting and inverting each
+        # column as a whole.
+        columns = []
+        for ordering in orderings:
+            key = ordering.attr.key
+            column = [record.get(key) for record in records]
+            column = [0 if value is None else value for value in column]
+
+            types = set(map(type, column))
+            if len(types) == 1:
+                # the usual case: look up the converter once per column
+                convert = CONVERTERS.get(types.pop())
+                if convert is not None:
+                    column = list(map(convert, column))
+            elif not types.isdisjoint(CONVERTERS):
+                column = [
+                    CONVERTERS[type(value)](value)
+                    if type(value) in CONVERTERS else value
+                    for value in column
+                ]
+
+            if ordering.desc:
+                column = list(map(_Reversed, column))
+
+            columns.append(column)
+
+        # one index tuple per record, stored by position, as records are
+        # dicts and therefore can't be used as dict keys themselves.
+        indexes = list(zip(*columns))
+
+        # now that we have the indexes, sort record positions by them (an
+        # "argsort"), so that the sort's key function is a C-level lookup.
+        order = sorted(range(len(records)), key=indexes.__getitem__)
+        return [records[i] for i in order]
\ No newline at end of file
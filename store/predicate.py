@@ -2,12 +2,12 @@
 Classes used to form predicate logic processed by Query.execute().
 """
 
-import bisect
-
-from typing import Any, Set, Text
+from itertools import islice
+from typing import Any, Callable, Iterable, Optional, Set, Text
 
 from .constants import OP_CODE
 from .util import union
+from .indexer import HashIndex
 
 
 class Predicate:
@@ -44,96 +44,26 @@ class Predicate:
         the given store whose records match the predicate's logic. This is used
         in `Query` execution.
         """
-        indexer = store.indexer
-
         if predicate is None:
             return store.records.keys()
 
-        op_code = predicate.op_code
-        empty = set()
-        computed_ids = set()
-
-        # is predicate >, <, ==, !=, >=, <=, one_of, etc.?
-        if isinstance(predicate, ConditionalExpression):
-            # fetch the ID subset according to the predicate
-            # and union them into the accumulating computed_ids set.
-            key = predicate.attr.key
-            val = predicate.value
-            index = indexer.indices.get(key)
-
-            # if the index doesn't exist yet, just skip it,
-            # as this implies no data with the given key is
-            # contained in the store.
-            if not index:
-                return set()
+        return predicate.compile()(store)
+
+    def compile(self) -> Callable[[Any], Set]:
+        """
+        Translate the predicate tree into a function that takes a store and
+        returns the set of primary keys whose records match the predicate.
+        Op codes are dispatched on once, here, rather than on each evaluation.
+        """
+        raise NotImplementedError()
 
-            if op_code == OP_CODE.EQ:
-                computed_ids = index.get(val, empty)
-            elif op_code == OP_CODE.NE:
-                computed_ids = union([
-                    id_set for v_idx, id_set in index.items()
-                    if v_idx != val
-                ])
-            elif op_code == OP_CODE.IN:
-                # containment - we compute the union of all sets of ids whose
-                # corresponding records have the given values in the index
-                val = val if isinstance(val, set) else set(val)
-                computed_ids = union([index.get(k_idx, empty) for k_idx in val])
-
-            elif op_code == OP_CODE.NOT_IN:
-                # the inverse of containment...
-                val = val if isinstance(val, set) else set(val)
-                computed_ids = union([
-                    id_set for v_idx, id_set in index.items()
-                    if v_idx not in val
-                ])
-            else:
-                # handle inequalities, computing limit and offset to form an
-                # interval with which we index the actual BTree
-                keys = list(index.keys())
-                offset = None
-                interval = None
-
-                if op_code == OP_CODE.GE:
-                    offset = bisect.bisect_left(keys, val)
-                    interval = slice(offset, None, 1)
-
-                elif op_code == OP_CODE.GT:
-                    offset = bisect.bisect(keys, val)
-                    interval = slice(offset, None, 1)
-
-                elif op_code == OP_CODE.LT:
-                    offset = bisect.bisect_left(keys, val)
-                    interval = slice(0, offset, 1)
-
-                elif op_code == OP_CODE.LEQ:
-                    offset = bisect.bisect(keys, val)
-                    interval = slice(0, offset, 1)
-
-                assert offset is not None
-                assert interval is not None
-
-                computed_ids = union([
-                    index[key] for key in keys[interval] if key is not None
-                ])
-        elif isinstance(predicate, BooleanExpression):
-            # recursively compute and union child predicates,
-            # left-hand side (lhs) and right-hand side (rhs)
-            lhs = predicate.lhs
-            rhs = predicate.rhs
-
-            if op_code == OP_CODE.AND:
-                lhs_result = cls.evaluate(store, lhs)
-                if lhs_result:
-                    rhs_result = cls.evaluate(store, rhs)
-                    computed_ids = set.intersection(lhs_result, rhs_result)
-
-            elif op_code == OP_CODE.OR:
-                lhs_result = cls.evaluate(store, lhs)
-                rhs_result = cls.evaluate(store, rhs)
-                computed_ids = set.union(lhs_result, rhs_result)
-
-        return computed_ids
+    def estimate(self, store) -> int:
+        """
+        Return a cheap upper bound on the number of records in the given store
+        that match the predicate, used to decide the order in which the
+        operands of an AND are evaluated.
+        """
+        return len(store.records)
 
     def copy(self) -> 'Predicate':
         raise NotImplementedError()
@@ -153,10 +83,47 @@ class ConditionalExpression(Predicate):
         self.attr = attr        # <- a SymbolicAttribute object
         self.key = attr.key
         self.value = value
+        self._compiled: Optional[Callable[[Any], Set]] = None
 
     def copy(self) -> 'ConditionalExpression':
         return type(self)(self.op_code, self.attr, self.value)
 
+    def estimate(self, store) -> int:
+        index = store.indexer.indices.get(self.key)
+        if not index:
+            return 0
+        if self.op_code == OP_CODE.EQ:
+            return len(index.get(self.value, ()))
+        return len(store.records)
+
+    def compile(self) -> Callable[[Any], Set]:
+        # conditions are shared between queries, so they keep their closure
+        if self._compiled is not None:
+            return self._compiled
+
+        op_code = self.op_code
+        key = self.key
+        val = self.value
+
+        compute = COMPUTE_FUNCTIONS.get(op_code)
+        if compute is None:
+            raise ValueError(f'unrecognized op code: {op_code}')
+
+        if op_code in (OP_CODE.IN, OP_CODE.NOT_IN):
+            val = val if isinstance(val, set) else set(val)
+
+        def evaluate(store) -> Set:
+            # if the index doesn't exist yet, this implies that no data with
+            # the given key is contained in the store.
+            index = store.indexer.indices.get(key)
+            if not index:
+                return set()
+            return compute(index, val)
+
+        self._compiled = evaluate
+        return evaluate
+
+
 class BooleanExpression(Predicate):
     """
     BooleanExpression represent statements like:
@@ -171,4 +138,166 @@ class BooleanExpression(Predicate):
         self.rhs = rhs
 
     def copy(self) -> 'BooleanExpression':
-        return type(self)(self.op_code, self.lhs.copy(), self.rhs.copy())
\ No newline at end of file
+        return type(self)(self.op_code, self.lhs.copy(), self.rhs.copy())
+
+    def estimate(self, store) -> int:
+        lhs_estimate = self.lhs.estimate(store)
+        rhs_estimate = self.rhs.estimate(store)
+        if self.op_code == OP_CODE.AND:
+            return min(lhs_estimate, rhs_estimate)
+        return min(lhs_estimate + rhs_estimate, len(store.records))
+
+    def compile(self) -> Callable[[Any], Set]:
+        # recursively compile child predicates,
+        # left-hand side (lhs) and right-hand side (rhs)
+        lhs = self.lhs.compile()
+        rhs = self.rhs.compile()
+
+        if self.op_code == OP_CODE.AND:
+            estimate_lhs = self.lhs.estimate
+            estimate_rhs = self.rhs.estimate
+
+            def evaluate(store) -> Set:
+                # evaluate the more selective side first, so that the other
+                # side can be skipped altogether if it matches nothing
+                first, second = lhs, rhs
+                if estimate_rhs(store) < estimate_lhs(store):
+                    first, second = rhs, lhs
+
+                first_result = first(store)
+                if not first_result:
+                    return set()
+                return set.intersection(first_result, second(store))
+
+        elif self.op_code == OP_CODE.OR:
+            def evaluate(store) -> Set:
+                # copy the larger side and add the smaller side to it
+                lhs_result = lhs(store)
+                rhs_result = rhs(store)
+                if len(lhs_result) < len(rhs_result):
+                    lhs_result, rhs_result = rhs_result, lhs_result
+                return set.union(lhs_result, rhs_result)
+
+        else:
+            raise ValueError(f'unrecognized op code: {self.op_code}')
+
+        return evaluate
+
+
+class ConjunctiveExpression(Predicate):
+    """
+    ConjunctiveExpression represents a conjunction of equality conditions on
+    distinct keys, as built by `query.where()` from statements like:
+    ```
+    query.where(user.name == 'Bob', user.age == 18)
+    ```
+    It's evaluated by intersecting the matching index entries directly,
+    smallest first, rather than as a tree of nested BooleanExpressions.
+    """
+    def __init__(self, conditions: Iterable[ConditionalExpression]) -> None:
+        super().__init__(OP_CODE.AND)
+        self.conditions = list(conditions)
+
+    @staticmethod
+    def is_applicable(predicates: Iterable[Predicate]) -> bool:
+        """
+        Can the given predicates be combined into a ConjunctiveExpression?
+        """
+        keys = set()
+        for predicate in predicates:
+            if not isinstance(predicate, ConditionalExpression):
+                return False
+            if predicate.op_code != OP_CODE.EQ or predicate.key in keys:
+                return False
+            keys.add(predicate.key)
+        return len(keys) > 1
+
+    def copy(self) -> 'ConjunctiveExpression':
+        return type(self)(c.copy() for c in self.conditions)
+
+    def estimate(self, store) -> int:
+        return min(c.estimate(store) for c in self.conditions)
+
+    def compile(self) -> Callable[[Any], Set]:
+        pairs = [(c.key, c.value) for c in self.conditions]
+
+        def evaluate(store) -> Set:
+            indices = store.indexer.indices
+            id_sets = []
+            for key, value in pairs:
+                index = indices.get(key)
+                id_set = index.get(value) if index else None
+                if not id_set:
+                    return set()
+                id_sets.append(id_set)
+
+            id_sets.sort(key=len)
+            return id_sets[0].intersection(*id_sets[1:])
+
+        return evaluate
+
+
+def _compute_eq(index, val) -> Set:
+    id_set = index.get(val)
+    return set() if id_set is None else id_set
+
+
+def _compute_ne(index, val) -> Set:
+    return union(id_set for v_idx, id_set in index.items() if v_idx != val)
+
+
+def _compute_in(index, val) -> Set:
+    # containment - we compute the union of all sets of ids whose
+    # corresponding records have the given values in the index, probing
+    # whichever of the two is smaller. only hash indices know their size
+    # cheaply, as len walks an entire BTree, so these are always probed.
+    if isinstance(index, HashIndex) and len(val) > len(index):
+        return union(
+            id_set for v_idx, id_set in index.items() if v_idx in val
+        )
+    return union(index.get(k_idx, EMPTY) for k_idx in val)
+
+
+def _compute_not_in(index, val) -> Set:
+    # the inverse of containment...
+    return union(
+        id_set for v_idx, id_set in index.items() if v_idx not in val
+    )
+
+
+# inequalities let the BTree find the range of matching values itself, via
+# its (C-level) range search. records with null values are indexed under
+# None, which the BTree sorts before everything else, so these are excluded
+# from "less than" ranges, which have no lower bound.
+def _compute_ge(index, val) -> Set:
+    return union(index.values(min=val))
+
+
+def _compute_gt(index, val) -> Set:
+    return union(index.values(min=val, excludemin=True))
+
+
+def _compute_lt(index, val) -> Set:
+    id_sets = index.values(max=val, excludemax=True)
+    return union(islice(id_sets, 1, None) if None in index else id_sets)
+
+
+def _compute_le(index, val) -> Set:
+    id_sets = index.values(max=val)
+    return union(islice(id_sets, 1, None) if None in index else id_sets)
+
+
+EMPTY = frozenset()
+
+# functions computing the set of primary keys matched by a conditional
+# expression from the index of its key and its value, keyed by op code
+COMPUTE_FUNCTIONS = {
+    OP_CODE.EQ: _compute_eq,
+    OP_CODE.NE: _compute_ne,
+    OP_CODE.IN: _compute_in,
+    OP_CODE.NOT_IN: _compute_not_in,
+    OP_CODE.GE: _compute_ge,
+    OP_CODE.GT: _compute_gt,
+    OP_CODE.LT: _compute_lt,
+    OP_CODE.LE: _compute_le,
+}
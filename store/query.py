@@ -4,15 +4,14 @@ Query main class.
 
 from copy import deepcopy
 from functools import reduce
-from collections import OrderedDict
 from typing import (
     Any, Callable, Iterable, List, Optional,
-    Set, Text, Type, Union, Dict
+    Set, Text, Tuple, Type, Union, Dict
 )
 
 from .interfaces import StateDictInterface, StoreInterface, QueryInterface
 from .exceptions import NotSelectable
-from .predicate import Predicate
+from .predicate import Predicate, ConjunctiveExpression
 from .symbol import SymbolicAttribute
 from .ordering import Ordering
 
@@ -58,6 +57,7 @@ class Query(QueryInterface):
         self.limit_index: Optional[int] = None
         self.offset_index: Optional[int] = None
         self.callbacks: Set[Callable] = set()
+        self._compiled: Optional[Tuple[Predicate, Callable]] = None
 
     def __call__(self, *args, **kwargs) -> Any:
         """
@@ -66,16 +66,15 @@ class Query(QueryInterface):
         return self.execute(*args, **kwargs)
 
     def execute(
-        self, first=False, dtype: Type = OrderedDict
+        self, first=False, dtype: Type = dict
     ) -> Optional[Union[StateDictInterface, Dict, Iterable]]:
         """
         Execute the query, returning either a single StateDict or an ID map of
         multiple.
         """
-        def project(record, selected, pkey_name) -> StateDictInterface:
+        def project(record, keys) -> StateDictInterface:
             """Return a projection of the given record dict"""
-            if selected:
-                keys = set(selected.keys()) | {pkey_name}
+            if keys:
                 return record.projection(keys)
             else:
                 return record
@@ -93,45 +92,43 @@ class Query(QueryInterface):
         # otherwise, evaluate the where-Predicate, returning a set of IDs
         # to then select via get_many.
         else:
-            pkeys = Predicate.evaluate(self.store, self.predicate)
+            pkeys = self.compile()(self.store)
             records = list(self.store.get_many(pkeys).values())
 
         # if no records return, just return
         if not records:
-            return None if first else OrderedDict()
+            return None if first else {}
 
         # order the records
         if self.orderings:
             records = Ordering.sort(records, self.orderings)
 
         # paginate after ordering
-        if self.offset_index is not None:
-            offset = self.offset_index
-            if self.limit_index is not None:
-                limit = self.limit_index
-                records = records[offset:offset+limit]
-            else:
-                records = records[offset:]
-        elif self.limit_index is not None:
-            records = records[:self.limit_index]
+        if self.offset_index is not None or self.limit_index is not None:
+            offset = self.offset_index or 0
+            limit = self.limit_index
+            records = records[offset:None if limit is None else offset + limit]
 
         pkey_name = self.store.pkey_name
         retval = None
 
+        # keys to project, computed once for all records
+        keys = (set(self.selected) | {pkey_name}) if self.selected else None
+
         # compute the return value based on dtype
         if first:
             # only return the first record dict
-            record = project(records[0], self.selected, pkey_name)
+            record = project(records[0], keys)
             execute_callbacks(self, record)
             retval = record
         elif issubclass(dtype, dict):
             retval = dtype() # ID => StateDict
             for record in records:
                 pkey = record[self.store.pkey_name]
-                retval[pkey] = project(record, self.selected, pkey_name)
+                retval[pkey] = project(record, keys)
         else:
             retval = dtype(
-                project(record, self.selected, pkey_name)
+                project(record, keys)
                 for record in records
             )
             retval.index = retval[self.store.pkey_name]
@@ -141,6 +138,15 @@ class Query(QueryInterface):
 
         return retval
 
+    def compile(self) -> Callable[[StoreInterface], Set]:
+        """
+        Return the compiled where-predicate, compiling it only if it has
+        changed since the last execution.
+        """
+        if self._compiled is None or self._compiled[0] is not self.predicate:
+            self._compiled = (self.predicate, self.predicate.compile())
+        return self._compiled[1]
+
     def clear(self) -> None:
         """
         Clear all internal state. This returns the query to its newly
@@ -186,7 +192,8 @@ class Query(QueryInterface):
         """
         query = Query(store=store or self.store)
         query.selected = {k: v.copy() for k, v in self.selected.items()}
-        query.predicate = self.predicate.copy()
+        if self.predicate is not None:
+            query.predicate = self.predicate.copy()
         query.orderings = deepcopy(self.orderings)
         query.limit_index = self.limit_index
         query.offset_index = self.offset_index
@@ -232,7 +239,12 @@ class Query(QueryInterface):
             self.predicate = None
 
         if len(predicates) > 1:
-            predicate = reduce(lambda x, y: x & y, predicates)
+            if ConjunctiveExpression.is_applicable(predicates):
+                # equality conditions on distinct keys can be intersected
+                # directly from their indices.
+                predicate = ConjunctiveExpression(predicates)
+            else:
+                predicate = reduce(lambda x, y: x & y, predicates)
         else:
             predicate = predicates[0]
 
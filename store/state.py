@@ -2,9 +2,9 @@
 class StateDict
 """
 
-from copy import deepcopy
 from typing import Any, Dict, Optional, Text, Set, Union, Iterable
 
+from .util import ATOMIC_TYPES, clone, deepcopy
 from .interfaces import StateDictInterface, StoreInterface, TransactionInterface
 
 
@@ -21,6 +21,7 @@ class StateDict(StateDictInterface):
         super().__init__(*args, **kwargs)
         self.store: Optional[StoreInterface] = None
         self.transaction: Optional[TransactionInterface] = None
+        self.version: Optional[int] = None  # of the record last synced with
 
     @property
     def backend(self) -> Optional[Union[TransactionInterface, StoreInterface]]:
@@ -61,9 +62,13 @@ class StateDict(StateDictInterface):
     def __deepcopy__(self, memo) -> 'StateDict':
         """
         This ensures that only the data itself is deep-copied; otherwise, we run
-        into all sorts of trouble with unpickle-able references.
+        into all sorts of trouble with unpickle-able references. Atomic values
+        are shared rather than passed through deepcopy.
         """
-        copy = StateDict(deepcopy(dict(self)))
+        copy = StateDict({
+            k: v if type(v) in ATOMIC_TYPES else deepcopy(v, memo)
+            for k, v in self.items()
+        })
         copy.store = self.store
         copy.transaction = self.transaction
         return copy
@@ -77,6 +82,10 @@ class StateDict(StateDictInterface):
         if sync:
             # sync to store or transaction
             self.backend.update(self, set(values.keys()))
+        else:
+            # the dict may no longer match the record it was last synced
+            # with, so it must be refreshed on the next read
+            self.version = None
         return self
 
     def setdefault(self, key: Any, value: Any) -> Any:
@@ -86,9 +95,11 @@ class StateDict(StateDictInterface):
         need be.
         """
         if key not in self:
-            self.backend.update(self, key)
+            super().__setitem__(key, value)
+            self.backend.update(self, {key})
+            return value
 
-        return super().setdefault(key, value)
+        return super().__getitem__(key)
 
     def delete(self, keys: Optional[Set[Text]] = None) -> 'StateDict':
         """
@@ -116,15 +127,37 @@ class StateDict(StateDictInterface):
                 return value
             return default
         else:
+            if key in self:
+                # the dict no longer matches the record it was last synced
+                # with, so it must be refreshed on the next read
+                self.version = None
             return super().pop(key, default)
 
+    def popitem(self) -> tuple:
+        """
+        Remove and return a (key, value) pair from the dict, but not from the
+        backend store or transaction.
+        """
+        item = super().popitem()
+        self.version = None
+        return item
+
+    def clear(self) -> None:
+        """
+        Remove all values from the dict, but not from the backend store or
+        transaction.
+        """
+        super().clear()
+        self.version = None
+
     def projection(self, keys: Iterable[Text]) -> 'StateDict':
         """
         Return a copy of self, which contains only those keys named in `keys`.
         """
-        proj = StateDict({
-            k: v for k, v in deepcopy(dict(self)).items() if k in keys
-        })
+        # copy only the projected values, not the entire record
+        proj = StateDict(clone({
+            k: v for k, v in self.items() if k in keys
+        }))
         proj.store = self.store
         proj.transaction = self.transaction
 
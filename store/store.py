@@ -2,46 +2,145 @@
 class Store
 """
 
-from uuid import uuid4
-from collections import OrderedDict
-from threading import RLock
-from copy import deepcopy
+import os
+
+from itertools import count
+from threading import Lock, RLock
 from typing import (
     Any, Dict, Optional, Set,
-    OrderedDict as OrderedDictType,
     Iterable, Text, Union, Callable,
     Type
 )
 from weakref import WeakValueDictionary
 
-from appyratus.memoize import memoized_property
-
 from .interfaces import StateDictInterface, StoreInterface, TransactionInterface
-from .transaction import Transaction
+from .transaction import Transaction, ReadOnlyTransaction
 from .symbol import Symbol, SymbolicAttribute
 from .query import Query
 from .indexer import Indexer
-from .util import to_dict
+from .identity import LRUIdentityMap
+from .util import clone, to_dict, get_pkey, get_pkeys
 from .state import StateDict
 
 
+UUID_POOL_SIZE = 1024  # number of UUIDs drawn from os.urandom at a time
+
+# random bytes for new UUIDs, shared by all stores, including the front stores
+# of transactions, and the offset of the next unused 16 bytes
+_uuid_lock = Lock()
+_uuid_bytes = b''
+_uuid_offset = 0
+
+
+def _new_uuid_hex() -> Text:
+    """
+    Return a random (version 4) UUID hex string. Its bytes are sliced from a
+    pool filled by a single call to os.urandom for every UUID_POOL_SIZE UUIDs,
+    rather than one call per UUID, as with uuid4.
+    """
+    global _uuid_bytes, _uuid_offset
+
+    with _uuid_lock:
+        offset = _uuid_offset
+        if offset >= len(_uuid_bytes):
+            _uuid_bytes = os.urandom(16 * UUID_POOL_SIZE)
+            offset = 0
+        _uuid_offset = offset + 16
+        data = bytearray(_uuid_bytes[offset:offset + 16])
+
+    # set the RFC 4122 version and variant bits
+    data[6] = (data[6] & 0x0F) | 0x40
+    data[8] = (data[8] & 0x3F) | 0x80
+    return data.hex()
+
+
+def _reset_uuid_pool() -> None:
+    """
+    Discard the UUID pool in forked child processes, which would otherwise
+    hand out the same UUIDs as their parent.
+    """
+    global _uuid_lock, _uuid_bytes, _uuid_offset
+    _uuid_lock = Lock()
+    _uuid_bytes = b''
+    _uuid_offset = 0
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_uuid_pool)
+
+
+def _to_record(target: Any) -> Dict:
+    """
+    Convert a create target that isn't a plain dict into a record dict.
+    """
+    if isinstance(target, StateDict):
+        # copy it so that setting its pkey doesn't sync to its store
+        return dict(target)
+    elif isinstance(target, dict):
+        return target
+    else:
+        # try to convert instance object to dict
+        return to_dict(target)
+
+
 class Store(StoreInterface):
     """
     Store objects act as dict-based in-memory SQL-like databases.
+
+    Records are copied on their way into and out of the store. Set the
+    `deep_copy` class attribute to False in a subclass whose records contain
+    only immutable values to make these copies shallow.
     """
 
+    deep_copy = True
+
+    __slots__ = (
+        'pkey_name',
+        'indexer',
+        'dict_type',
+        'records',
+        'identity',
+        '_has_identity',
+        'lock',
+        '_row',
+        '_versions',
+        '_clock',
+        '__weakref__',
+    )
+
     def __init__(
         self,
         pkey: Text = 'id',
         dict_type: Type[StateDict] = StateDict,
+        identity_size: Optional[int] = None,
     ):
+        """
+        - `pkey`: the name of the primary key in each record
+        - `dict_type`: the StateDict class returned by CRUD methods
+        - `identity_size`: if set, the identity map holds strong references to
+          at most this many recently used StateDicts (or none, if 0), instead
+          of weak references to all StateDicts in use.
+        """
         super().__init__()
         self.pkey_name = pkey
         self.indexer = Indexer(self.pkey_name)
         self.dict_type = dict_type
         self.records: Dict[Text, Dict] = {}
-        self.identity = WeakValueDictionary()
+        self.identity = (
+            WeakValueDictionary() if identity_size is None
+            else LRUIdentityMap(identity_size)
+        )
+        # a capacity of 0 disables the identity map
+        self._has_identity = identity_size is None or identity_size > 0
         self.lock = RLock()
+        self._row: Optional[Symbol] = None
+
+        # map from pkey to the version of its record, drawn from a store-wide
+        # clock each time the record is written. StateDicts in the identity
+        # map remember the version they were last synced with, so that reads
+        # can skip refreshing those that are already up to date.
+        self._versions: Dict[Any, int] = {}
+        self._clock = count()
 
     def __contains__(self, target: Any) -> bool:
         """
@@ -49,11 +148,7 @@ class Store(StoreInterface):
         a primary key value, a dict with a primary key as a dict key, or an
         arbitrary object with a primary key as an attribute.
         """
-        if isinstance(target, dict):
-            pkey = target[self.pkey_name]
-        else:
-            pkey = getattr(target, self.pkey_name, target)
-        return pkey in self.records
+        return get_pkey(target, self.pkey_name) in self.records
 
     def __len__(self) -> int:
         """
@@ -68,14 +163,14 @@ class Store(StoreInterface):
         pkey = record.get(self.pkey_name)
         if pkey is not None:
             return pkey
-        else:
-            return uuid4().hex
+
+        return _new_uuid_hex()
 
     def state_dict_factory(self, data: Dict) -> StateDict:
         """
-        Create a deep copy of the given data dict, returning a new StateDict.
+        Create a copy of the given data dict, returning a new StateDict.
         """
-        record = self.dict_type(deepcopy(data))
+        record = self.dict_type(clone(data) if self.deep_copy else data)
         record.store = self
         return record
 
@@ -83,8 +178,22 @@ class Store(StoreInterface):
         """
         Remove all records from the store.
         """
-        self.indexer = Indexer(self.pkey_name)
+        self.indexer.clear()
         self.records.clear()
+        self._versions.clear()
+
+    def create_index(self, key: Text, kind: Text = 'btree') -> None:
+        """
+        Set the kind of index used for the given key. By default, all keys use
+        B-tree indices; however, "hash" indices are faster to maintain and
+        are preferable for keys only ever queried by equality, like:
+
+        ```python
+        store.create_index('email', kind='hash')
+        ```
+        """
+        with self.lock:
+            self.indexer.create_index(key, kind)
 
     @staticmethod
     def symbol() -> Symbol:
@@ -94,7 +203,7 @@ class Store(StoreInterface):
         """
         return Symbol()
 
-    @memoized_property
+    @property
     def row(self) -> Symbol:
         """
         For convenience, this can be used when forming queries, like:
@@ -108,9 +217,15 @@ class Store(StoreInterface):
         )
 
         """
-        return Symbol()
+        if self._row is None:
+            self._row = Symbol()
+        return self._row
 
-    def transaction(self, callback: Optional[Callable] = None) -> Transaction:
+    def transaction(
+        self,
+        callback: Optional[Callable] = None,
+        read_only: bool = False,
+    ) -> Transaction:
         """
         Create a new transaction. Can be used in a with-statement, like so:
         
@@ -120,9 +235,14 @@ class Store(StoreInterface):
             thing.update({'foo': 'bar', 'spam': 'eggs'})
             other_thing = trans.get(...)
             other_thing.delete()
+        ```
+
+        Read-only transactions read directly from this store and raise
+        NotWritable on any attempt to write through them.
         """
-        front = type(self)(self.pkey_name, dict_type=self.dict_type)
-        return Transaction(self, front, callback=callback)
+        if read_only:
+            return ReadOnlyTransaction(self, callback=callback)
+        return Transaction(self, callback=callback)
 
     def select(self, *targets: Union[SymbolicAttribute, Text]) -> Query:
         """
@@ -140,49 +260,71 @@ class Store(StoreInterface):
     def get_many(
         self,
         targets: Optional[Iterable[Any]] = None,
-    ) -> OrderedDictType[Any, StateDictInterface]:
+    ) -> Dict[Any, StateDictInterface]:
         """
         Return a multiple records by primary key. Records are returned in the
         form of a dict, mapping each primary key to a possibly-null record dict.
         Dict keys have the same order as the order with which they are provided
         in the `pkey` primary key argument.
         """
-        with self.lock:
-            if not targets:
-                # return all records by default
-                state_dicts = OrderedDict()
-                for pkey in self.records:
-                    state_dict = self.identity.get(pkey)
-                    if state_dict is None:
-                        record = self.records[pkey]
-                        state_dict = self.state_dict_factory(record)
-                    state_dicts[pkey] = state_dict
-                return state_dicts
-            else:
-                # return only the indicated records
-                fetched_states = OrderedDict()
-
-                for target in targets:
-                    # get pkey
-                    if isinstance(target, dict):
-                        pkey = target[self.pkey_name]
-                    else:
-                        pkey = getattr(target, self.pkey_name, target)
+        records = self.records
+        identity = self.identity
+        versions = self._versions
 
-                    record = self.records.get(pkey)
-
-                    # create or update StateDict
-                    if record is not None:
-                        state_dict = self.identity.get(pkey)
-                        if state_dict is not None:
-                            state_dict.update(record, sync=False)
-                        else:
-                            state_dict = self.state_dict_factory(record)
-                            self.identity[pkey] = state_dict
+        # reads don't acquire the lock: dict lookups are atomic, and we only
+        # fall back to the lock when we need to create or refresh a StateDict.
+        if targets is None:
+            # return all records by default. the pkeys are copied, as writers
+            # may change the size of the records dict while we iterate.
+            pkeys = list(records)
+        else:
+            # return only the indicated records
+            pkeys = get_pkeys(targets, self.pkey_name)
 
-                        fetched_states[pkey] = state_dict
+        fetched_states = {}
 
-                return fetched_states
+        if not self._has_identity:
+            # without an identity map, a new StateDict is built on each read
+            for pkey in pkeys:
+                record = records.get(pkey)
+                if record is not None:
+                    state_dict = self.state_dict_factory(record)
+                    state_dict.version = versions.get(pkey)
+                    fetched_states[pkey] = state_dict
+            return fetched_states
+
+        for pkey in pkeys:
+            if pkey not in records:
+                continue
+
+            # return the existing StateDict if it's up to date
+            state_dict = identity.get(pkey)
+            if state_dict is not None:
+                if state_dict.version == versions.get(pkey):
+                    fetched_states[pkey] = state_dict
+                    continue
+
+            # otherwise, create or refresh it
+            with self.lock:
+                # check again, in case another thread beat us to it or the
+                # record has since been deleted
+                record = records.get(pkey)
+                if record is None:
+                    continue
+
+                version = versions.get(pkey)
+                state_dict = identity.get(pkey)
+                if state_dict is None:
+                    state_dict = self.state_dict_factory(record)
+                    state_dict.version = version
+                    identity[pkey] = state_dict
+                elif state_dict.version != version:
+                    state_dict.update(record, sync=False)
+                    state_dict.version = version
+
+            fetched_states[pkey] = state_dict
+
+        return fetched_states
 
     def create(
         self,
@@ -200,45 +342,80 @@ class Store(StoreInterface):
         self,
         targets: Iterable[Any],
         transaction: Optional[TransactionInterface] = None
-    ) -> OrderedDictType[Any, StateDict]:
+    ) -> Dict[Any, StateDict]:
         """
         Insert multiple records in the store, returning a mapping of created
         primary key to created record. Dict keys are ordered by insertion.
         """
-        created = OrderedDict()
+        created = {}
+
+        # normalize targets to dicts. plain dicts (the usual case) are matched
+        # by exact type, so only other kinds of targets pay for isinstance.
+        records = [
+            target if type(target) is dict else _to_record(target)
+            for target in targets
+        ]
+
+        # the attributes used for each record are bound to locals up front
+        pkey_name = self.pkey_name
+        pkey_factory = self.pkey_factory
+        copy = clone if self.deep_copy else dict
+        state_dict_factory = self.state_dict_factory
 
         with self.lock:
-            for target in targets:
-                # try to convert instance object to dict
-                if not isinstance(target, dict):
-                    record = to_dict(target)
-                else:
-                    if isinstance(target, StateDict):
-                        record = dict(target)
-                    else:
-                        record = target
+            stored = self.records
+            versions = self._versions
+            identity = self.identity if self._has_identity else None
+            clock = self._clock
+            inserted = []
 
-                record[self.pkey_name] = self.pkey_factory(record)
-                record = deepcopy(record)
-                pkey = record[self.pkey_name]
+            for record in records:
+                record[pkey_name] = pkey_factory(record)
+                record = copy(record)
+                pkey = record[pkey_name]
 
                 # store in global primary key map
-                self.records[pkey] = record
-                state_dict = self.state_dict_factory(record)
-                self.identity[pkey] = state_dict
-
-                # update index B-trees for each 
-                if record is not None:
-                    self.indexer.insert(record, keys=record.keys())
+                stored[pkey] = record
+                state_dict = state_dict_factory(record)
+                state_dict.version = versions[pkey] = next(clock)
+                if identity is not None:
+                    identity[pkey] = state_dict
+                inserted.append(record)
 
                 # add record to return created dict
                 created[pkey] = state_dict
                 if transaction is not None:
                     state_dict.transaction = transaction
-                    transaction.created_pkeys.add(pkey)
+
+            # update index B-trees for the whole batch at once
+            self.indexer.insert_many(inserted)
+
+            if transaction is not None:
+                transaction.created_pkeys.update(created)
 
         return created
 
+    def _adopt_many(self, records: Iterable[Dict]) -> None:
+        """
+        Insert records that the store can take ownership of as-is, without
+        copying them or creating StateDicts, as with the records of a
+        transaction's front store, which it discards upon committing. StateDicts
+        are created lazily, when the records are next read. The caller must
+        hold the lock.
+        """
+        stored = self.records
+        versions = self._versions
+        identity = self.identity
+        pkey_name = self.pkey_name
+
+        for record in records:
+            pkey = record[pkey_name]
+            stored[pkey] = record
+            versions[pkey] = next(self._clock)
+            identity.pop(pkey, None)
+
+        self.indexer.insert_many(records)
+
     def update(
         self,
         target: Any,
@@ -251,69 +428,87 @@ class Store(StoreInterface):
         # cast target as dict
         record = to_dict(target)
 
-        pkey = record[self.pkey_name]
-
-        # keys to update:
-        keys = set(keys or record.keys())
-
-        existing_record = self.records[pkey]
-
-        # updating indices works by comparing old values to new;
-        # therefore, we need to make a copy of the pre-updated state
-        old_state = existing_record.copy()
-
         with self.lock:
-            if not keys:
-                # update the entire record
-                existing_record.update(record)
-            else:
-                # update only certain keys
-                existing_record.update({
-                    k: v for k, v in record.items() if k in record
-                })
-
-            # update keys in indices
-            self.indexer.update(old_state, existing_record, keys)
-
-            state_dict = self.identity.get(pkey)
-            if state_dict:
-                state_dict.update(record, sync=False)
-            else:
-                state_dict = self.state_dict_factory(existing_record)
-                self.identity[pkey] = state_dict
-
-            # if this update call is part of a transaction,
-            # save a reference to it.
-            if transaction is not None:
-                state_dict.transaction = transaction
-                transaction.updated_pkeys.add(pkey)
-
-            return state_dict
+            return self._update(record, keys, transaction)
 
     def update_many(
         self,
         targets: Iterable[Any],
         transaction: Optional[TransactionInterface] = None
-    ) -> OrderedDictType[Any, StateDict]:
+    ) -> Dict[Any, StateDict]:
         """
         Update multiple records in the store, returning a mapping from updated
         record primary key to corresponding record. Dict keys preserve the same
         order of the `records` argument.
         """
-        updated = OrderedDict()
+        updated = {}
 
-        with self.lock:
-            for target in targets:
-                # cast target as dict
-                record = to_dict(target)
+        # cast targets as dicts, matching plain dicts by exact type
+        records = [
+            target if type(target) is dict else to_dict(target)
+            for target in targets
+        ]
 
-                # update the record
+        # the lock is acquired once for the whole batch, and each record is
+        # updated without re-entering it via self.update
+        with self.lock:
+            for record in records:
                 pkey = record[self.pkey_name]
                 if pkey in self.records:
-                    updated[pkey] = self.update(record, transaction=transaction)
+                    updated[pkey] = self._update(record, None, transaction)
 
         return updated
 
+    def _update(
+        self,
+        record: Dict,
+        keys: Optional[Set],
+        transaction: Optional[TransactionInterface],
+    ) -> StateDict:
+        """
+        Apply an update to an existing record. The caller must hold the lock.
+        """
+        pkey = record[self.pkey_name]
+
+        if not keys:
+            # update the entire record
+            values = record
+        else:
+            # update only certain keys
+            values = {k: record[k] for k in keys if k in record}
+
+        existing_record = self.records[pkey]
+        existing_record.update(values)
+
+        # update keys in indices. the indexer only iterates over these, so
+        # the keys view is used as-is rather than copied into a set.
+        self.indexer.update(existing_record, values.keys())
+
+        version = next(self._clock)
+        prev_version = self._versions.get(pkey)
+        self._versions[pkey] = version
+
+        state_dict = self.identity.get(pkey) if self._has_identity else None
+        if state_dict:
+            # it's only current if it was before this update
+            is_current = state_dict.version == prev_version
+            state_dict.update(values, sync=False)
+            if is_current:
+                state_dict.version = version
+        else:
+            state_dict = self.state_dict_factory(existing_record)
+            state_dict.version = version
+            if self._has_identity:
+                self.identity[pkey] = state_dict
+
+        # if this update call is part of a transaction,
+        # save a reference to it.
+        if transaction is not None:
+            state_dict.transaction = transaction
+            transaction.updated_pkeys.add(pkey)
+
+        return state_dict
+
     def delete(
         self,
         target: Any,
@@ -324,10 +519,7 @@ class Store(StoreInterface):
         Delete an entire record from the store if no `keys` argument supplied;
         otherwise, drop only the specified keys from the stored record.
         """
-        if isinstance(target, dict):
-            pkey = target[self.pkey_name]
-        else:
-            pkey = getattr(target, self.pkey_name, target)
+        pkey = get_pkey(target, self.pkey_name)
         with self.lock:
             # tell the transaction to delete this record on commit
             if not keys and transaction is not None:
@@ -337,22 +529,22 @@ class Store(StoreInterface):
                 if not keys:
                     # remove the entire record
                     record = self.records.pop(pkey)
+                    self._versions.pop(pkey, None)
                     self.indexer.remove(record)
                 else:
                     record = self.records[pkey]
-                    old_record = record.copy()
-
                     # remove keys from record
                     for key in keys:
                         if key in record:
                             record[key] = None
 
                     # remove keys in indices
-                    self.indexer.update(old_record, record, keys=keys)
+                    self.indexer.update(record, keys=keys)
+                    self._versions[pkey] = next(self._clock)
 
                     # tell transaction to update this pkey on commit
                     if transaction is not None:
-                        transaction.updated_pkeys[pkey].update(keys)
+                        transaction.updated_pkeys.add(pkey)
 
     def delete_many(
         self,
@@ -365,40 +557,44 @@ class Store(StoreInterface):
         supplied; otherwise, drop only the specified keys from the stored
         records.
         """
-        with self.lock:
-            if not keys:
-                # drop entire objects
-                for target in targets:
-                    # get pkey
-                    if isinstance(target, dict):
-                        pkey = target[self.pkey_name]
-                    else:
-                        pkey = getattr(target, self.pkey_name, target)
-
-                    self.delete(pkey, transaction=transaction)
-            else:
-                # drop only the keys/columns
-                keys = keys if isinstance(keys, set) else set(keys)
-                for target in targets:
-                    # get pkey
-                    if isinstance(target, dict):
-                        pkey = target[self.pkey_name]
-                    else:
-                        pkey = target
+        if not keys:
+            # extract primary keys before acquiring the lock
+            pkeys = get_pkeys(targets, self.pkey_name)
 
+            with self.lock:
+                # tell the transaction to delete these records on commit
+                if transaction is not None:
+                    transaction.deleted_pkeys.update(pkeys)
+
+                # drop entire records and remove them from the indices
+                records = self.records
+                removed = [
+                    records.pop(pkey) for pkey in pkeys if pkey in records
+                ]
+                versions = self._versions
+                for pkey in pkeys:
+                    versions.pop(pkey, None)
+                if removed:
+                    self.indexer.remove_many(removed)
+        else:
+            # drop only the keys/columns
+            keys = keys if isinstance(keys, set) else set(keys)
+            with self.lock:
+                for target in targets:
+                    pkey = get_pkey(target, self.pkey_name)
                     record = self.records.get(pkey)
 
-                    # tell the transaction that this record should be removed
-                    # upon commit.
-                    if transaction is not None:
-                        transaction.updated_pkeys[pkey].update(keys)
-
                     if record:
-                        old_record = record.copy()
+                        # tell the transaction to update this record upon
+                        # commit.
+                        if transaction is not None:
+                            transaction.updated_pkeys.add(pkey)
+
                         # remove keys from record
                         for key in keys:
                             if key in record:
                                 record[key] = None
 
                         # remove keys from indices
-                        self.indexer.update(old_record, record, keys=keys)
+                        self.indexer.update(record, keys=keys)
+                        self._versions[pkey] = next(self._clock)
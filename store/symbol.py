@@ -2,8 +2,10 @@
 class Symbol
 """
 
+import sys
+
 from copy import deepcopy
-from typing import Any, Optional, Text, Iterable, Type, Dict, Union
+from typing import Any, Optional, Text, Iterable, Tuple, Type, Dict, Union
 
 from .util import get_hashable
 from .constants import OP_CODE
@@ -11,6 +13,10 @@ from .predicate import ConditionalExpression
 from .interfaces import OrderingInterface, QueryInterface, StateDictInterface, StoreInterface, SymbolicAttributeInterface
 
 
+# max number of ConditionalExpressions cached per SymbolicAttribute
+CONDITION_CACHE_SIZE = 256
+
+
 class SymbolicAttribute(SymbolicAttributeInterface):
     """
     SymbolicAttribute instances are returned via Symbol.__getattr__. For
@@ -19,6 +25,8 @@ class SymbolicAttribute(SymbolicAttributeInterface):
     implementation of the Query class.
     """
 
+    __slots__ = ('key', 'symbol', 'ordering_class', '_conditions')
+
     def __init__(self, key: Text, symbol: Optional['Symbol'] = None) -> None:
         super().__init__()
 
@@ -26,36 +34,64 @@ class SymbolicAttribute(SymbolicAttributeInterface):
 
         self.ordering_class: Type[OrderingInterface] = Ordering
         self.symbol = symbol
-        self.key = key
+        self.key = sys.intern(key) if type(key) is str else key
+        self._conditions: Dict[Tuple, ConditionalExpression] = {}
 
     def copy(self) -> 'SymbolicAttribute':
         return type(self)(self.key, self.symbol)
 
+    def _condition(self, op_code: Text, value: Any) -> ConditionalExpression:
+        """
+        Return a ConditionalExpression for this attribute. These are cached, so
+        that queries built repeatedly, as in request handlers, share the same
+        predicates -- and their compiled closures. The cache is cleared when it
+        reaches CONDITION_CACHE_SIZE. Membership conditions aren't cached, as
+        their values may be arbitrarily large collections.
+        """
+        value = get_hashable(value)
+        if op_code in (OP_CODE.IN, OP_CODE.NOT_IN):
+            return ConditionalExpression(op_code, self, value)
+
+        cache_key = (op_code, type(value), value)
+        try:
+            condition = self._conditions.get(cache_key)
+        except TypeError:
+            # the value isn't hashable through and through (like a tuple
+            # containing a list), so it can't be cached
+            return ConditionalExpression(op_code, self, value)
+
+        if condition is None:
+            condition = ConditionalExpression(op_code, self, value)
+            if len(self._conditions) >= CONDITION_CACHE_SIZE:
+                self._conditions.clear()
+            self._conditions[cache_key] = condition
+        return condition
+
     def __lt__(self, value: Any) -> ConditionalExpression:
-        return ConditionalExpression(OP_CODE.LT, self, get_hashable(value))
+        return self._condition(OP_CODE.LT, value)
 
     def __gt__(self, value: Any) -> ConditionalExpression:
-        return ConditionalExpression(OP_CODE.GT, self, get_hashable(value))
+        return self._condition(OP_CODE.GT, value)
 
     def __ge__(self, value: Any) -> ConditionalExpression:
-        return ConditionalExpression(OP_CODE.GE, self, get_hashable(value))
+        return self._condition(OP_CODE.GE, value)
 
     def __le__(self, value: Any) -> ConditionalExpression:
-        return ConditionalExpression(OP_CODE.LE, self, get_hashable(value))
+        return self._condition(OP_CODE.LE, value)
 
     def __eq__(self, value: Any) -> ConditionalExpression:
-        return ConditionalExpression(OP_CODE.EQ, self, get_hashable(value))
+        return self._condition(OP_CODE.EQ, value)
 
     def __ne__(self, value: Any) -> ConditionalExpression:
-        return ConditionalExpression(OP_CODE.NE, self, get_hashable(value))
+        return self._condition(OP_CODE.NE, value)
 
     def __deepcopy__(self, memo) -> 'SymbolicAttribute':
         """
-        What happens on deepcopy(attr). Note that the symbol attribute is *not*
-        deep copied, as most likely, this would result in an infinite loop with
-        respect to Symbol's own __deepcopy__ method.
+        What happens on deepcopy(attr). SymbolicAttributes are never mutated
+        after creation -- their key is a string, and their symbol is meant to
+        be shared by reference -- so the attribute itself is returned.
         """
-        return type(self)(self.key, self.symbol)
+        return self
 
     def one_of(self, value: Iterable) -> ConditionalExpression:
         """
@@ -65,7 +101,7 @@ class SymbolicAttribute(SymbolicAttributeInterface):
         query.where(user.email.one_of(subsriber_email_list))
         ```
         """
-        return ConditionalExpression(OP_CODE.IN, self, get_hashable(value))
+        return self._condition(OP_CODE.IN, value)
 
     def not_in(self, value: Iterable) -> ConditionalExpression:
         """
@@ -75,7 +111,7 @@ class SymbolicAttribute(SymbolicAttributeInterface):
         query.where(user.email.not_in(subsriber_email_list))
         ```
         """
-        return ConditionalExpression(OP_CODE.NOT_IN, self, get_hashable(value))
+        return self._condition(OP_CODE.NOT_IN, value)
 
     @property
     def asc(self) -> OrderingInterface:
@@ -136,18 +172,26 @@ class Symbol:
         assert attr.key == 'email'
         ```
 
-        The SymbolicAttribute is memoized in self._attrs.
+        The SymbolicAttribute is memoized in self._attrs and also set as an
+        instance attribute, so that subsequent accesses don't go through
+        __getattr__ at all.
         """
-        if key not in self._attrs:
+        if key == '_attrs':
+            # not initialized yet, as during unpickling
+            raise AttributeError(key)
+
+        attr = self._attrs.get(key)
+        if attr is None:
             # create and memoize SymbolicAttribute
             attr = SymbolicAttribute(key, symbol=self)
             self._attrs[key] = attr
+            object.__setattr__(self, key, attr)
 
-        return self._attrs[key]
+        return attr
 
     def __deepcopy__(self, memo) -> 'Symbol':
+        # SymbolicAttributes are immutable, so the copy can share them
         copy = type(self)()
-        copy._attrs = {
-            k: SymbolicAttribute(k, self) for k in self._attrs
-        }
+        copy._attrs = dict(self._attrs)
+        copy.__dict__.update(self._attrs)
         return copy
\ No newline at end of file
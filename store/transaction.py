@@ -1,6 +1,5 @@
-from collections import defaultdict
+from operator import itemgetter
 from typing import (
-    OrderedDict as OrderedDictType,
     Text,
     Any,
     Dict,
@@ -13,9 +12,12 @@ from typing import (
 
 from appyratus.memoize import memoized_property
 
-from .util import get_pkeys, to_dict
+from .util import clone, get_pkeys, to_dict
+from .exceptions import NotWritable
 from .symbol import Symbol
 from .query import Query
+from .constants import OP_CODE
+from .predicate import Predicate, ConditionalExpression
 from .interfaces import (
     QueryInterface,
     StoreInterface,
@@ -24,6 +26,16 @@ from .interfaces import (
 )
 
 
+def _get_records(records: Dict, pkeys: Set) -> Iterable[Dict]:
+    """
+    Return the records with the given primary keys, fetched by a single
+    (C-level) itemgetter call.
+    """
+    if len(pkeys) == 1:
+        return [records[pkey] for pkey in pkeys]
+    return itemgetter(*pkeys)(records)
+
+
 class Transaction(TransactionInterface):
     """
     Transactions are created by Stores via the store.transaction() method. In
@@ -33,17 +45,24 @@ class Transaction(TransactionInterface):
     Operations performed in a transaction are applied to a separate Store
     instance, denoted "front" in code. Upon comitting the transaction, all
     create, update, and delete methods called on the front store are atomically
-    applied to the back store.
+    applied to the back store. The front store is created lazily, upon first
+    use, so that transactions which end up doing nothing cost next to nothing.
     """
 
-    def __init__(self, back, front, callback: Optional[Callable] = None):
+    def __init__(
+        self,
+        back,
+        front=None,
+        callback: Optional[Callable] = None
+    ):
         super().__init__()
         self.back: StoreInterface = back
-        self.front: StoreInterface = front
+        self._front: Optional[StoreInterface] = front
         self.callback = callback
         self.deleted_pkeys = set()
         self.updated_pkeys = set()
         self.created_pkeys = set()
+        self._untouched = None  # cached (sizes, predicate) for select
 
     def __enter__(self):
         """
@@ -70,6 +89,17 @@ class Transaction(TransactionInterface):
             self.commit()
             return True
 
+    @property
+    def front(self) -> StoreInterface:
+        """
+        Return the front store, creating it if it doesn't exist yet.
+        """
+        if self._front is None:
+            self._front = type(self.back)(
+                self.back.pkey_name, dict_type=self.back.dict_type
+            )
+        return self._front
+
     @property
     def records(self) -> Dict:
         """
@@ -106,35 +136,47 @@ class Transaction(TransactionInterface):
         applied to self.front to self.back. Afterwards, apply custom "on_commit"
         callback.
         """
-        # flush changes to backend store,
-        with self.back.lock:
-            # flush delete statements
-            if self.deleted_pkeys:
-                self.back.delete_many(self.deleted_pkeys)
-
-            # flush create statements
-            created_pkeys = self.created_pkeys - self.deleted_pkeys
-            if created_pkeys:
-                self.back.create_many(
-                    self.front.records[pkey] for pkey in created_pkeys
-                )
-
-            # flush update statements
-            updated_pkeys = self.updated_pkeys - self.deleted_pkeys
-            if updated_pkeys:
-                self.back.update_many(
-                    self.front.records[pkey] for pkey in updated_pkeys
-                )
-
-            # trigger custom callback method
-            if self.callback is not None:
-                created = {k: self.front.records[k] for k in self.created_pkeys}
-                updated = {k: self.front.records[k] for k in self.updated_pkeys}
-                deleted = self.deleted_pkeys.copy()
-                self.callback(self, created, updated, deleted)
-
-            # reinitialize transaction
-            self.clear()
+        back = self.back
+        deleted_pkeys = self.deleted_pkeys
+
+        # nothing can have been written if the front store was never created
+        front_records = self._front.records if self._front is not None else {}
+
+        # deleted records are neither created nor updated
+        created_pkeys = self.created_pkeys - deleted_pkeys
+        updated_pkeys = self.updated_pkeys - deleted_pkeys
+
+        # flush changes to backend store, unless there are none, in which
+        # case there's no need to acquire its lock.
+        if deleted_pkeys or created_pkeys or updated_pkeys:
+            with back.lock:
+                # flush delete statements
+                if deleted_pkeys:
+                    back.delete_many(deleted_pkeys)
+
+                # flush create statements. the front store's records are
+                # handed over to the back store as-is, as they're discarded
+                # afterwards.
+                if created_pkeys:
+                    back._adopt_many(_get_records(front_records, created_pkeys))
+
+                # flush update statements
+                if updated_pkeys:
+                    back.update_many(_get_records(front_records, updated_pkeys))
+
+        # trigger custom callback method. this is done outside of the lock, as
+        # callbacks may do arbitrary work, like I/O, that would otherwise
+        # block other threads from using the back store.
+        if self.callback is not None:
+            # created records now belong to the back store, so copies are
+            # passed to the callback
+            created = {k: clone(front_records[k]) for k in created_pkeys}
+            updated = {k: front_records[k] for k in updated_pkeys}
+            deleted = deleted_pkeys.copy()
+            self.callback(self, created, updated, deleted)
+
+        # reinitialize transaction
+        self.clear()
 
     def rollback(self):
         """
@@ -146,10 +188,12 @@ class Transaction(TransactionInterface):
         """
         Clear internal record, reseting the Transaction to its initialized record.
         """
-        self.front.clear()
+        if self._front is not None:
+            self._front.clear()
         self.deleted_pkeys.clear()
         self.created_pkeys.clear()
         self.updated_pkeys.clear()
+        self._untouched = None
 
     def create(self, record: Dict) -> Dict:
         """
@@ -160,7 +204,7 @@ class Transaction(TransactionInterface):
     
     def create_many(
         self, records: Iterable[Any]
-    ) -> OrderedDictType[Any, StateDictInterface]:
+    ) -> Dict[Any, StateDictInterface]:
         """
         Insert multiple record dicts.
         """
@@ -187,37 +231,67 @@ class Transaction(TransactionInterface):
                 else:
                     return back_result
 
+        # create a query for back store
+        query = self.back.select(*targets)
+
         # we don't want to needless fetch records from the back store, so we
         # will construct a query that excludes any of its records' pkeys.
-        front_pkeys = (
-            self.deleted_pkeys | self.created_pkeys | self.updated_pkeys
-        )
-        # create a query for back store
-        query = self.back.select(*targets).where(
-            self.back.row[self.back.pkey_name].not_in(front_pkeys)
-        )
+        predicate = self._get_untouched_predicate()
+        if predicate is not None:
+            query.where(predicate)
+
         # call merge upon back query executing
         query.subscribe(merge)
 
         return query
     
+    def _get_untouched_predicate(self) -> Optional[Predicate]:
+        """
+        Return a predicate excluding records created, updated or deleted in
+        this transaction from back store queries, or None if there are none.
+        As these pkey sets only grow until the transaction is cleared, the
+        predicate is cached until their sizes change, rather than rebuilt from
+        their union on each select.
+        """
+        sizes = (
+            len(self.deleted_pkeys),
+            len(self.created_pkeys),
+            len(self.updated_pkeys),
+        )
+        if not any(sizes):
+            return None
+
+        if self._untouched is None or self._untouched[0] != sizes:
+            pkeys = self.deleted_pkeys | self.created_pkeys | self.updated_pkeys
+            # built directly, rather than through not_in, so that it bypasses
+            # the symbolic attribute's condition cache
+            predicate = ConditionalExpression(
+                OP_CODE.NOT_IN,
+                self.back.row[self.back.pkey_name],
+                frozenset(pkeys),
+            )
+            self._untouched = (sizes, predicate)
+
+        return self._untouched[1]
+
     def get(self, target: Any) -> Optional[StateDictInterface]:
         """
         Get a single record by ID.
         """
-        pkey = get_pkeys([target], self.front.pkey_name)[0]
+        front = self.front
+        pkey = get_pkeys([target], front.pkey_name)[0]
 
         if pkey in self.deleted_pkeys:
             return None
 
         # if record not present in front, load from back into font.
         # then return the dict from front.
-        if target not in self.front:
+        if pkey not in front.records:
             record = self.back.get(pkey)
             if record is not None:
-                record = self.front.create(record)
+                record = front.create(record)
         else:
-            record = self.front.get(pkey)
+            record = front.get(pkey)
 
         if record is not None:
             record.transaction = self
@@ -226,23 +300,39 @@ class Transaction(TransactionInterface):
 
     def get_many(
         self, targets: Iterable[Any]
-    ) -> OrderedDictType[Any, StateDictInterface]:
+    ) -> Dict[Any, StateDictInterface]:
         """
         Get a multiple records by ID.
         """
-        pkeys = get_pkeys(targets, self.front.pkey_name, as_set=True)
-        pkeys -= self.deleted_pkeys
-
-        # get any records in the font store
-        records = self.front.get_many(pkeys)
+        front = self.front
+        pkeys = get_pkeys(targets, front.pkey_name, as_set=True)
+        deleted_pkeys = self.deleted_pkeys
+        if deleted_pkeys:
+            # filtered rather than subtracted, to preserve the pkeys' order
+            pkeys = [pkey for pkey in pkeys if pkey not in deleted_pkeys]
+
+        # get any records in the font store, unless it's still empty, in
+        # which case they must all be loaded from the back store.
+        if front.records:
+            records = front.get_many(pkeys)
+            missing_pkeys = [pkey for pkey in pkeys if pkey not in records]
+        else:
+            records = {}
+            missing_pkeys = pkeys
 
         # load any records not already in front into front from back
-        # and then add these to the returned ID map dict.
-        missing_pkey_set = pkeys - records.keys()
-        if missing_pkey_set:
-            back_states = self.back.get_many(missing_pkey_set)
-            self.front.create_many(back_states.values())
-            records.update(back_states)
+        # and then add the front copies to the returned ID map dict.
+        if missing_pkeys:
+            back_states = self.back.get_many(missing_pkeys)
+            loaded = front.create_many(back_states.values())
+            if records:
+                records.update(loaded)
+            else:
+                # none were in front, so the loaded records are the result
+                records = loaded
+
+        for record in records.values():
+            record.transaction = self
 
         return records
 
@@ -257,44 +347,50 @@ class Transaction(TransactionInterface):
         else:
             record = target
 
-        pkey = record[self.front.pkey_name]
-        if pkey not in self.front:
-            back_state = self.back.get(pkey)
-            self.front.create(back_state)
+        # load the record from back into front. if it doesn't exist, or has
+        # been deleted in this transaction, the front store raises KeyError.
+        front = self.front
+        self._load([record[front.pkey_name]])
 
         # only update records in front store
-        record = self.front.update(record, keys=keys, transaction=self)
+        record = front.update(record, keys=keys, transaction=self)
         return record
 
     def update_many(
         self, targets: Iterable[Dict]
-    ) -> OrderedDictType[Any, StateDictInterface]:
+    ) -> Dict[Any, StateDictInterface]:
         """
         Update multiple records.
         """
-        # normalize targets to record dicts
+        # normalize targets to record dicts. plain dicts (the usual case) are
+        # matched by exact type, so only other kinds of targets pay for
+        # to_dict's isinstance check.
         records = [
-            to_dict(target) if not isinstance(target, dict) else target
+            target if type(target) is dict else to_dict(target)
             for target in targets
         ]
 
-        pkeys = get_pkeys(records, self.front.pkey_name, as_set=True)
-        missing_pkey_set = pkeys - self.front.records.keys()
-
-        # get missing records from back and load into front store
-        back_states = self.back.get_many(missing_pkey_set)
-        self.front.create_many(back_states.values())
+        # load any records not already in front from back
+        front = self.front
+        self._load(record[front.pkey_name] for record in records)
 
         # perform updates to records solely in front store
-        records = self.front.update_many(records, transaction=self)
+        records = front.update_many(records, transaction=self)
         return records
 
     def delete(self, target: Any, keys: Optional[Iterable[Text]] = None):
         """
         Drop an entire record or specific keys.
         """
+        front = self.front
+        if keys:
+            # keys are removed from the front copy of the record, so load it
+            # from back, if need be, to be updated in back upon commit
+            target = get_pkeys([target], front.pkey_name)[0]
+            self._load([target])
+
         # delete records only from font store
-        self.front.delete(target, keys=keys, transaction=self)
+        front.delete(target, keys=keys, transaction=self)
 
     def delete_many(
         self,
@@ -305,5 +401,128 @@ class Transaction(TransactionInterface):
         Delete multiple records from the store (or, if keys present, just remove
         the given keys from the target records).
         """
+        front = self.front
+        if keys:
+            # as in delete, load records from back to remove the keys from
+            targets = get_pkeys(targets, front.pkey_name)
+            self._load(targets)
+
         # delete solely from front store
-        self.front.delete_many(targets, transaction=self)
+        front.delete_many(targets, keys=keys, transaction=self)
+
+    def _load(self, pkeys: Iterable[Any]) -> None:
+        """
+        Load records from the back store into the front store, unless they're
+        already there or have been deleted in this transaction.
+        """
+        front = self.front
+        front_records = front.records
+        deleted_pkeys = self.deleted_pkeys
+        missing_pkeys = [
+            pkey for pkey in pkeys
+            if pkey not in front_records and pkey not in deleted_pkeys
+        ]
+        if missing_pkeys:
+            back_states = self.back.get_many(missing_pkeys)
+            front.create_many(back_states.values())
+
+
+class ReadOnlyTransaction(Transaction):
+    """
+    ReadOnlyTransactions are created via store.transaction(read_only=True).
+    Reads go straight to the back store, under its lock, as there is nothing
+    for them to be isolated from, so no front store is ever created. Records
+    are returned as copies bound to the transaction, so that any attempt to
+    write, whether through the transaction, its queries or its records, raises
+    NotWritable.
+    """
+
+    @property
+    def records(self) -> Dict:
+        """
+        Alias for self.back.records.
+        """
+        return self.back.records
+
+    @property
+    def pkey_name(self) -> Text:
+        """
+        Alias for self.back.pkey_name.
+        """
+        return self.back.pkey_name
+
+    @property
+    def indexer(self) -> Any:
+        """
+        Alias for self.back.indexer, used by queries executed through this
+        transaction.
+        """
+        return self.back.indexer
+
+    def select(self, *targets: Union[Symbol.Attribute, Text]) -> QueryInterface:
+        """
+        Generate a query over the back store that fetches its records through
+        this transaction, so that deleting its results raises NotWritable.
+        """
+        return Query(self).select(*targets)
+
+    def get(self, target: Any) -> Optional[StateDictInterface]:
+        """
+        Get a single record by ID.
+        """
+        records = list(self.get_many([target]).values())
+        return records[0] if records else None
+
+    def get_many(
+        self, targets: Optional[Iterable[Any]] = None
+    ) -> Dict[Any, StateDictInterface]:
+        """
+        Get multiple records by ID, or all records if no targets are given.
+        The back store's StateDicts are copied, so that the copies can be
+        bound to this transaction without affecting other users of the store.
+        """
+        back = self.back
+        with back.lock:
+            states = back.get_many(targets)
+            records = {}
+            for pkey, state in states.items():
+                record = back.state_dict_factory(state)
+                record.transaction = self
+                records[pkey] = record
+        return records
+
+    def create(self, *args, **kwargs):
+        """
+        Raise NotWritable, as read-only transactions can't create records.
+        """
+        raise NotWritable('create')
+
+    def create_many(self, *args, **kwargs):
+        """
+        Raise NotWritable, as read-only transactions can't create records.
+        """
+        raise NotWritable('create_many')
+
+    def update(self, *args, **kwargs):
+        """
+        Raise NotWritable, as read-only transactions can't update records.
+        """
+        raise NotWritable('update')
+
+    def update_many(self, *args, **kwargs):
+        """
+        Raise NotWritable, as read-only transactions can't update records.
+        """
+        raise NotWritable('update_many')
+
+    def delete(self, *args, **kwargs):
+        """
+        Raise NotWritable, as read-only transactions can't delete records.
+        """
+        raise NotWritable('delete')
+
+    def delete_many(self, *args, **kwargs):
+        """
+        Raise NotWritable, as read-only transactions can't delete records.
+        """
+        raise NotWritable('delete_many')
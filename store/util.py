@@ -2,15 +2,30 @@
 Misc. functions.
 """
 
-import inspect
-
-from typing import Any, Dict, Set, Text, List, Iterable, Union
+from operator import attrgetter, itemgetter
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import (
+    Any, Callable, Dict, Optional, Set, Text, List, Iterable, KeysView, Union
+)
 from collections.abc import Hashable
-
-from ordered_set import OrderedSet
+from uuid import UUID
 
 from .exceptions import NotHashable
 
+try:
+    # copium is a faster, drop-in implementation of copy.deepcopy
+    from copium import deepcopy
+except ImportError:
+    from copy import deepcopy
+
+
+# immutable types whose values can be shared by copies of a record
+ATOMIC_TYPES = frozenset({
+    str, int, float, bool, complex, bytes, type(None),
+    date, datetime, time, timedelta, Decimal, UUID,
+})
+
 
 def is_hashable(obj: Any) -> bool:
     """
@@ -19,29 +34,130 @@ def is_hashable(obj: Any) -> bool:
     return isinstance(obj, Hashable)
 
 
+def _by_type(item: Any) -> tuple:
+    return (type(item).__name__, item)
+
+
+def _by_key_type(pair: tuple) -> tuple:
+    return (type(pair[0]).__name__, pair[0])
+
+
+def _sorted_tuple(items: List, type_key: Callable[[Any], tuple]) -> tuple:
+    """
+    Return the items of an unordered collection as a sorted tuple, so that
+    equal collections map to equal, orderable values. Sorting is skipped for
+    fewer than two items, and items that can't be compared, like keys of mixed
+    types, are grouped by type name first, using the given sort key.
+    """
+    if len(items) > 1:
+        try:
+            items.sort()
+        except TypeError:
+            items.sort(key=type_key)
+    return tuple(items)
+
+
+def _hashable_dict(value: Dict) -> tuple:
+    return _sorted_tuple(
+        [(k, get_hashable(v)) for k, v in value.items()], _by_key_type
+    )
+
+
+def _hashable_list(value: List) -> tuple:
+    return tuple(get_hashable(x) for x in value)
+
+
+def _hashable_set(value: Set) -> tuple:
+    return _sorted_tuple([get_hashable(x) for x in value], _by_type)
+
+
+# map from container type to function converting its values to hashables.
+# tuples and frozensets are included, as they may contain unhashable items,
+# and so that sets and frozensets of the same items are indexed alike.
+HASHABLE_CONVERTERS = {
+    dict: _hashable_dict,
+    list: _hashable_list,
+    tuple: _hashable_list,
+    set: _hashable_set,
+    frozenset: _hashable_set,
+}
+
+
 def get_hashable(value: Any, return_exc=False) -> Any:
     """
     Some datatypes, like dicts and sets, are not hashable and can't be
     inserted into index dicts as keys; therefore, we must convert them to a
     form that is. That's what we do here.
     """
-    if isinstance(value, dict):
-        return tuple(sorted(
-            (k, get_hashable(v)) for k, v in value.items()
-        ))
-    elif isinstance(value, list):
-        return tuple(get_hashable(x) for x in value)
-    elif isinstance(value, set):
-        return tuple(sorted(get_hashable(x) for x in value))
+    # most values are atomic and are returned as-is, without further checks
+    value_type = type(value)
+    if value_type in ATOMIC_TYPES:
+        return value
+
+    convert = HASHABLE_CONVERTERS.get(value_type)
+    if convert is not None:
+        return convert(value)
+
+    # scalars and other hashable values are returned as-is
+    if value_type.__hash__ is not None:
+        return value
+
+    # subclasses of the unhashable types above, like StateDict
+    for base_type, convert in HASHABLE_CONVERTERS.items():
+        if isinstance(value, base_type):
+            return convert(value)
+
+    exc = NotHashable(value)
+    if not return_exc:
+        raise exc
+    return exc
+
+
+def copy_value(value: Any, memo: Optional[Dict] = None) -> Any:
+    """
+    Return a deep copy of a record value. Nested dicts and lists, which make
+    up most non-atomic values in JSON-like records, are copied here directly,
+    checking for atomic leaves inline; deepcopy is left only the rest. As with
+    deepcopy, the memo maps the ids of copied objects to their copies, so that
+    shared and self-referencing objects are copied once.
+    """
+    value_type = type(value)
+    if value_type in ATOMIC_TYPES:
+        return value
+
+    if memo is None:
+        memo = {}
     else:
-        exc = NotHashable(
-            f'cannot store unhashable types, but got {type(value)}'
+        copy = memo.get(id(value))
+        if copy is not None:
+            return copy
+
+    if value_type is dict:
+        copy = memo[id(value)] = {}
+        for k, v in value.items():
+            copy[k] = v if type(v) in ATOMIC_TYPES else copy_value(v, memo)
+        return copy
+    if value_type is list:
+        copy = memo[id(value)] = []
+        copy.extend(
+            v if type(v) in ATOMIC_TYPES else copy_value(v, memo)
+            for v in value
         )
-        if not is_hashable(value):
-            if not return_exc:
-                raise exc
-            return exc
-        return value
+        return copy
+    return deepcopy(value, memo)
+
+
+def clone(record: Dict) -> Dict:
+    """
+    Return a deep copy of a record dict. Values of atomic (immutable) types,
+    which make up the bulk of most records, are shared instead of being passed
+    through deepcopy's type dispatch and memo bookkeeping.
+    """
+    copy = {}
+    memo = {id(record): copy}
+    for k, v in record.items():
+        copy[k] = v if type(v) in ATOMIC_TYPES else copy_value(v, memo)
+    return copy
 
 
 def to_dict(obj: Any) -> Dict:
@@ -53,50 +169,103 @@ def to_dict(obj: Any) -> Dict:
         return obj
 
     data = {}
-    predicate = lambda x: not callable(x)
+    seen = set()
 
-    for key, val in inspect.getmembers(obj, predicate=predicate):
-        if not key.startswith('_'):
+    def add(key, val):
+        if not callable(val):
             # only accept hashable (or forcably hashable) values
             hashable_val = get_hashable(val, return_exc=True)
             if not isinstance(hashable_val, NotHashable):
                 data[key] = val
 
+    # instance attributes, read directly from the instance's __dict__
+    for key, val in getattr(obj, '__dict__', {}).items():
+        if not key.startswith('_'):
+            seen.add(key)
+            add(key, val)
+
+    # class attributes, including properties and slots, which are resolved
+    # through getattr, walking the MRO rather than scanning dir(obj)
+    for cls in type(obj).__mro__[:-1]:
+        for key in vars(cls):
+            if key.startswith('_') or key in seen:
+                continue
+            seen.add(key)
+            try:
+                val = getattr(obj, key)
+            except AttributeError:
+                # like an unset slot
+                continue
+            add(key, val)
+
     return data
 
 
-def union(sequences):
+def union(sequences: Iterable[Iterable]) -> Set:
     """
-    Perform set union
+    Perform set union, returning a new set. The union is computed by a single
+    C-level call, which adds each sequence to the result in place.
     """
-    if sequences:
-        if len(sequences) == 1:
-            return sequences[0]
-        else:
-            return set.union(*sequences)
-    else:
-        return set()
+    return set().union(*sequences)
+
+
+def get_pkey(target: Any, pkey_name: Text) -> Any:
+    """
+    Extract a "primary key" from a dict, an object with a primary key
+    attribute, or a bare primary key value. Plain dicts, by far the most common
+    target, are matched by exact type before falling back to isinstance.
+    """
+    if type(target) is dict or isinstance(target, dict):
+        return target[pkey_name]
+    return getattr(target, pkey_name, target)
+
+
+def get_pkey_getter(
+    sample: Any, pkey_name: Text
+) -> Optional[Callable[[Any], Any]]:
+    """
+    Return a function that extracts a "primary key" from targets of the same
+    type as the given sample, as per get_pkey, but without its type checks.
+    Return None if targets of this type must be checked one by one.
+    """
+    if isinstance(sample, dict):
+        return itemgetter(pkey_name)
+    if hasattr(sample, pkey_name):
+        return attrgetter(pkey_name)
+    if type(sample) in ATOMIC_TYPES:
+        # bare primary key values
+        return lambda target: target
+    return None
 
 
 def get_pkeys(
     targets: Iterable[Any], pkey_name: Text, as_set=False
-) -> Union[List, OrderedSet]:
-    """
-    Extract and return "primary keys" from a sequence of objects.
-    """
-    if as_set:
-        pkeys = OrderedSet()
-        for target in targets:
-            if isinstance(target, dict):
-                pkeys.add(target[pkey_name])
-            else:
-                pkeys.add(getattr(target, pkey_name, target))
-        return pkeys
-    else:
-        pkeys = []
-        for target in targets:
-            if isinstance(target, dict):
-                pkeys.append(target[pkey_name])
-            else:
-                pkeys.append(getattr(target, pkey_name, target))
-        return pkeys
\ No newline at end of file
+) -> Union[List, KeysView]:
+    """
+    Extract and return "primary keys" from a sequence of objects. When all the
+    targets are of the same type, the getter appropriate to the first is
+    mapped over the rest, rather than calling get_pkey on each one. If
+    as_set, the unique primary keys are returned, in order, as the keys view
+    of a dict, which supports set operations.
+    """
+    if not isinstance(targets, (list, tuple)):
+        targets = list(targets)
+
+    # the pkeys are collected straight into a dict if as_set, without first
+    # being collected into a list
+    collect = dict.fromkeys if as_set else list
+
+    pkeys = None
+    if targets and len(set(map(type, targets))) == 1:
+        getter = get_pkey_getter(targets[0], pkey_name)
+        if getter is not None:
+            try:
+                pkeys = collect(map(getter, targets))
+            except AttributeError:
+                # not all instances of the class have the pkey attribute
+                pass
+
+    if pkeys is None:
+        pkeys = collect(get_pkey(target, pkey_name) for target in targets)
+
+    return pkeys.keys() if as_set else pkeys
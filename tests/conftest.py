@@ -2,32 +2,74 @@
 Global Pytest fixtures and configuration.
 """
 
-from store.transaction import Transaction
-from uuid import uuid4
+import random
+
+from uuid import UUID
 from typing import Dict, List, Type
 
 import pytest
 
 from store.store import Store
+from store.transaction import Transaction
 
 
-@pytest.fixture(scope='function')
-def press_event() -> Dict:
+def pytest_addoption(parser):
+    parser.addoption(
+        '--run-perf', action='store_true', default=False,
+        help='run performance tests, which are skipped by default',
+    )
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', 'perf: mark test as a performance test')
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--run-perf'):
+        return
+
+    skip_perf = pytest.mark.skip(reason='needs --run-perf option to run')
+    for item in items:
+        if 'perf' in item.keywords:
+            item.add_marker(skip_perf)
+
+
+def new_id() -> UUID:
+    # tests only need distinct ids, so these are drawn from the random module
+    # rather than from os.urandom, as by uuid4
+    return UUID(int=random.getrandbits(128), version=4)
+
+
+# templates for event fixtures, which only add a new id and copy mutable values
+PRESS_EVENT = {'type': 'press', 'char': 'x'}
+CLICK_EVENT = {
+    'type': 'click',
+    'buttons': frozenset({'L', 'R'}),
+    'position': {'x': 1, 'y': 2},
+}
+
+
+def new_press_event() -> Dict:
+    return {'id': new_id(), **PRESS_EVENT}
+
+
+def new_click_event() -> Dict:
     return {
-        'id': uuid4(),
-        'type': 'press',
-        'char': 'x'
+        'id': new_id(),
+        **CLICK_EVENT,
+        'buttons': set(CLICK_EVENT['buttons']),
+        'position': dict(CLICK_EVENT['position']),
     }
 
 
+@pytest.fixture(scope='function')
+def press_event() -> Dict:
+    return new_press_event()
+
+
 @pytest.fixture(scope='function')
 def click_event() -> Dict:
-    return {
-        'id': uuid4(),
-        'type': 'click',
-        'buttons': {'L', 'R'},
-        'position': {'x': 1, 'y': 2}
-    }
+    return new_click_event()
 
 
 @pytest.fixture(scope='function')
@@ -35,6 +77,20 @@ def store_state_list(press_event, click_event) -> List[Dict]:
     return [press_event, click_event]
 
 
+@pytest.fixture(scope='session')
+def session_state_list() -> List[Dict]:
+    return [new_press_event(), new_click_event()]
+
+
+# a store with data, shared by tests that only read from it, so that it needn't
+# be rebuilt for each one. tests must not write to it.
+@pytest.fixture(scope='session')
+def read_only_store(session_state_list) -> Store:
+    store = Store('id')
+    store.create_many(session_state_list)
+    return store
+
+
 @pytest.fixture(scope='function')
 def store() -> Store:
     return Store('id')
@@ -43,13 +99,13 @@ def store() -> Store:
 
 @pytest.fixture(scope='function')
 def transaction(store) -> Transaction:
-    return Transaction(store, Store(store.pkey_name))
+    # the front store is created lazily, upon first use
+    return store.transaction()
 
 
 @pytest.fixture(scope='function')
 def store_with_data(store, store_state_list) -> Store:
-    for record in store_state_list:
-        store.create(record)
+    store.create_many(store_state_list)
     return store
 
 
@@ -1,26 +1,33 @@
+from uuid import UUID
+
+
 def test_create(store, press_event):
     record = store.create(press_event)
 
     # ensure the output dict is identical to the input dict but is not
     # the same object in memory (but rather a copy)
     assert record is not press_event
-    assert tuple(record.items()) == tuple(press_event.items())
+    assert record == press_event
+    assert list(record) == list(press_event)
     
     # check integrity of indexer.keys, which tracks which "column" keys of the
     # record are indexed for a given primary key. Note that the primary key
     # itself is not managed by the indexer.
-    pkey = record[store.pkey_name]
-    column_keys = set(record.keys())
+    pkey_name = store.pkey_name
+    keys_map = store.indexer.keys
+    indices = store.indexer.indices
+
+    pkey = record[pkey_name]
+    column_keys = record.keys()
 
-    assert pkey in store.indexer.keys
-    assert column_keys == store.indexer.keys[pkey]
+    assert pkey in keys_map
+    assert column_keys == keys_map[pkey].keys()
 
     # ensure that index data structures are indeed lazily constructed
-    assert store.pkey_name not in store.indexer.keys
+    assert pkey_name not in keys_map
     for k in column_keys:
-        assert k in store.indexer.indices
-        index = store.indexer.indices[k]
-        assert len(index) == 1
+        assert k in indices
+        assert len(indices[k]) == 1
 
 
 def test_create_with_iterable_value_types(store, click_event):
@@ -33,13 +40,13 @@ def test_create_with_iterable_value_types(store, click_event):
 
 
 def test_create_many_returns_expected(store, press_event):
-    # note that this test is not very long, as store.create_many internally
-    # just calls store.create multiple times -- once for each record.
+    # note that this test is not very long, as store.create internally just
+    # calls store.create_many with a single record.
     records = store.create_many([press_event])
     pkey = press_event[store.pkey_name]
 
     assert len(records) == 1
-    assert set(records.keys()) == {pkey}
+    assert next(iter(records)) == pkey
     assert records[pkey] == press_event
 
 
@@ -48,7 +55,7 @@ def test_basic_crud_with_instance_object(store, Person):
     person = Person('abc123', 'Frank', 17, [69, 666, "foo", 1337])
 
     record = store.create(person)
-    assert set(record.keys()) == {
+    assert record.keys() == {
         'id', 'name', 'age', 'lucky_numbers'
     }
     for k, v in record.items():
@@ -70,4 +77,27 @@ def test_id_is_autocreated(store):
     # ensure an ID is created by the store if not passed in raw dict argument.
     record = store.create({'foo': 'bar'})
     assert 'id' in record
-    assert record['id'] is not None
\ No newline at end of file
+    assert record['id'] is not None
+
+
+def test_autocreated_ids_are_unique_uuids(store):
+    records = store.create_many([{'foo': i} for i in range(1500)])
+    assert len(records) == 1500
+    for pkey in records:
+        assert UUID(pkey).version == 4
+
+
+def test_create_with_nested_unhashable_values(store):
+    record = store.create({'id': 1, 'pair': ([1, 2], {'a': 1})})
+    assert record['pair'] == ([1, 2], {'a': 1})
+
+    store.create({'id': 2, 'tags': frozenset({'x', 'y'})})
+    assert set(store.select().where(store.row.tags == {'x', 'y'})()) == {2}
+
+
+def test_create_copies_shared_values_once(store):
+    tags = ['a', 'b']
+    record = store.create({'id': 1, 'tags': tags, 'labels': tags})
+
+    assert record['tags'] is record['labels']
+    assert record['tags'] is not tags
@@ -14,9 +14,25 @@ def test_delete(store, press_event, click_event):
 
     assert not store.records
 
-    indexer = store.indexer
-    for k, index in indexer.indices.items():
-        for record in [press_event, click_event]:
+    records = [press_event, click_event]
+    for k, index in store.indexer.indices.items():
+        for record in records:
             if k in record:
                 v = get_hashable(record[k])
-                assert record['id'] not in index[v]
\ No newline at end of file
+                assert record['id'] not in index[v]
+
+
+def test_delete_many(store, press_event, click_event):
+    store.create_many([press_event, click_event])
+
+    store.delete_many([press_event])
+
+    assert list(store.records) == [click_event['id']]
+    assert set(store.indexer.keys) == {click_event['id']}
+    assert set(store.indexer.indices) == set(click_event)
+
+    store.delete_many([click_event])
+
+    assert not store.records
+    assert not store.indexer.keys
+    assert not store.indexer.indices
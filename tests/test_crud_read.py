@@ -1,14 +1,14 @@
-def test_get(store_with_data, store_state_list):
+def test_get(read_only_store, session_state_list):
     # ensure that each inserted record can be retrieved.
-    for record in store_state_list:
-        fetched_state = store_with_data.get(record['id'])
+    for record in session_state_list:
+        fetched_state = read_only_store.get(record['id'])
         assert fetched_state == record
 
 
-def test_get_many(store_with_data, store_state_list):
+def test_get_many(read_only_store, session_state_list):
     # ensure that each inserted record can be retrieved.
-    ids = [record['id'] for record in store_state_list]
-    fetched_states = store_with_data.get_many(ids)
+    ids = [record['id'] for record in session_state_list]
+    fetched_states = read_only_store.get_many(ids)
 
     assert isinstance(fetched_states, dict)
 
@@ -16,6 +16,6 @@ def test_get_many(store_with_data, store_state_list):
     assert ids == list(fetched_states.keys())
 
     # ensure records contain the right data
-    for record in store_state_list:
+    for record in session_state_list:
         fetched_state = fetched_states[record['id']]
         assert fetched_state == record
\ No newline at end of file
@@ -7,8 +7,7 @@ def test_update(store_with_data, press_event):
     fetched_state = store_with_data.get(press_event['id'])
     assert fetched_state['char'] == old_char
 
-    press_event['char'] = new_char
-    store_with_data.update(press_event)
+    store_with_data.update(dict(press_event, char=new_char))
 
     fetched_state = store_with_data.get(press_event['id'])
     assert fetched_state['char'] == new_char
@@ -28,11 +27,32 @@ def test_update_for_non_scalar(store_with_data, click_event):
     fetched_state = store_with_data.get(click_event['id'])
     assert fetched_state['position'] == old_value
 
-    click_event['position'] = new_value
-    store_with_data.update(click_event)
+    store_with_data.update(dict(click_event, position=new_value))
 
     fetched_state = store_with_data.get(click_event['id'])
     assert fetched_state['position'] == new_value
 
     assert new_value['x'] == new_value['x']
-    assert new_value['y'] == old_value['y']
\ No newline at end of file
+    assert new_value['y'] == old_value['y']
+
+
+def test_update_with_unchanged_values_keeps_indices(store):
+    record = store.create({'name': 'John', 'age': 6})
+    pkey = record['id']
+
+    store.update({'id': pkey, 'name': 'John', 'age': 7})
+
+    assert store.indexer.indices['name']['John'] == {pkey}
+    assert store.indexer.indices['age'][7] == {pkey}
+    assert 6 not in store.indexer.indices['age']
+
+
+def test_update_only_given_keys(store):
+    record = store.create({'name': 'John', 'age': 6})
+    pkey = record['id']
+
+    store.update({'id': pkey, 'name': 'Johnny', 'age': 7}, keys={'name'})
+
+    assert store.records[pkey]['name'] == 'Johnny'
+    assert store.records[pkey]['age'] == 6
+    assert 7 not in store.indexer.indices['age']
@@ -1,3 +1,8 @@
+import weakref
+
+from store.store import Store
+
+
 def test_fetched_objects_are_identical(store):
     a = store.create({'name': 'John'})
     b = store.get(a)
@@ -27,4 +32,63 @@ def test_identity_map_is_indeed_weak(store):
     # to the underlying StateDict remain.
     store.create({'name': 'John'})
 
-    assert len(store.identity) == 0
\ No newline at end of file
+    assert len(store.identity) == 0
+
+
+def test_bounded_identity_map_evicts_least_recently_used():
+    store = Store(identity_size=2)
+    a = store.create({'name': 'John'})
+    b = store.create({'name': 'Jane'})
+
+    # touch a so that b becomes the least recently used
+    assert store.get(a) is a
+
+    c = store.create({'name': 'Jack'})
+
+    assert len(store.identity) == 2
+    assert store.get(a) is a
+    assert store.get(c) is c
+    assert store.get(b) is not b
+
+
+def test_disabled_identity_map_builds_new_objects():
+    store = Store(identity_size=0)
+    a = store.create({'name': 'John'})
+    a.update({'name': 'Jane'})
+    b = store.get(a)
+
+    assert b is not a
+    assert b == a
+    assert store.get(a) is not b
+    assert len(store.identity) == 0
+
+
+def test_identical_object_is_refreshed_when_record_changes(store):
+    a = store.create({'name': 'John', 'age': 6})
+    assert store.get(a)['age'] == 6
+
+    store.delete(a, keys={'age'})
+    b = store.get(a)
+
+    assert b is a
+    assert b['age'] is None
+
+
+def test_identical_object_is_refreshed_after_local_changes(store):
+    a = store.create({'name': 'John', 'age': 6})
+
+    # popping without delete only changes the dict, not the stored record
+    assert a.pop('age') == 6
+    b = store.get(a)
+
+    assert b is a
+    assert dict(b) == {'id': a['id'], 'name': 'John', 'age': 6}
+
+    # as does updating without syncing
+    a.update({'age': 7}, sync=False)
+
+    assert store.get(a)['age'] == 6
+
+
+def test_store_can_be_weakly_referenced(store):
+    assert weakref.ref(store)() is store
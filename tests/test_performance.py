@@ -2,31 +2,79 @@ import random
 
 from string import ascii_letters
 from datetime import datetime, timedelta
-from typing import Text
+from typing import Any, Callable, Dict, Iterable, List, Text, Tuple
+
+import pytest
 
 from appyratus.utils.time_utils import TimeUtils
 
+from store.store import Store
+
+
+pytestmark = pytest.mark.perf
+
 
 def randstr(length: int) -> Text:
-    return ''.join(random.choice(ascii_letters) for _ in range(length))
+    return ''.join(random.choices(ascii_letters, k=length))
 
 
 def randdicts(count):
+    now = datetime.now()
     return [
         {
             'email': randstr(20),
             'first_name': randstr(8),
             'last_name': randstr(8),
             'companies': [randstr(random.randint(5, 10)) for _ in range(5)],
-            'joined_at': datetime.now(),
+            'joined_at': now,
             'age': random.randint(13, 100),
         } for i in range(count)
     ]
 
 
-def test_create_many_speed(store):
-    count = 10000
-    records = randdicts(count)
+def best_of(rounds: int, func: Callable) -> Tuple[Any, timedelta]:
+    # return the result of the last call along with the shortest duration, so
+    # that one-time work, like compiling predicates, isn't what's measured
+    durations = []
+    for _ in range(rounds):
+        result, duration = TimeUtils.timed(func)
+        durations.append(duration)
+    return result, min(durations)
+
+
+def copy_records(records: Iterable[Dict]) -> List[Dict]:
+    # stores set the pkey of created records and the update tests append to
+    # their companies lists, so these are copied; the rest are immutable.
+    return [dict(r, companies=list(r['companies'])) for r in records]
+
+
+# shared by all tests, which only ever modify copies of these records
+@pytest.fixture(scope='session')
+def bulk_records() -> List[Dict]:
+    return randdicts(10000)
+
+
+def modify_records(records: List[Dict]) -> None:
+    # the random deltas are drawn in one call, rather than one per record
+    days = random.choices(range(1, 101), k=len(records))
+    for record, delta in zip(records, days):
+        record['email'] = 'Elon.Musk@gmail.com'
+        record['companies'].append('SomethingElse')
+        record['joined_at'] += timedelta(days=delta)
+
+
+# a store seeded with the bulk records, created anew for each update test, so
+# that no test times updates to records already modified by another
+@pytest.fixture
+def seeded_store(bulk_records) -> Store:
+    store = Store('id')
+    store.create_many(copy_records(bulk_records))
+    return store
+
+
+def test_create_many_speed(store, bulk_records):
+    records = copy_records(bulk_records)
+    count = len(records)
 
     def create():
         return store.create_many(records)
@@ -39,9 +87,9 @@ def test_create_many_speed(store):
     assert len(created) == count
 
 
-def test_create_many_speed_in_transaction(store):
-    count = 10000
-    records = randdicts(count)
+def test_create_many_speed_in_transaction(store, bulk_records):
+    records = copy_records(bulk_records)
+    count = len(records)
 
     def create():
         with store.transaction() as trans:
@@ -55,16 +103,12 @@ def test_create_many_speed_in_transaction(store):
     assert len(created) == count
 
 
-def test_update_many_speed(store):
-    count = 10000
-    records = randdicts(count)
-
-    store.create_many(records)
+def test_update_many_speed(seeded_store):
+    store = seeded_store
+    records = copy_records(store.records.values())
+    count = len(records)
 
-    for record in records:
-        record['email'] = 'Elon.Musk@gmail.com'
-        record['companies'].append('SomethingElse')
-        record['joined_at'] += timedelta(days=random.randint(1, 100))
+    modify_records(records)
 
     def update():
         return store.update_many(records)
@@ -77,16 +121,12 @@ def test_update_many_speed(store):
     assert len(updated) == count
 
 
-def test_update_many_speed_in_transaction(store):
-    count = 10000
-    records = randdicts(count)
-
-    store.create_many(records)
+def test_update_many_speed_in_transaction(seeded_store):
+    store = seeded_store
+    records = copy_records(store.records.values())
+    count = len(records)
 
-    for record in records:
-        record['email'] = 'Elon.Musk@gmail.com'
-        record['companies'].append('SomethingElse')
-        record['joined_at'] += timedelta(days=random.randint(1, 100))
+    modify_records(records)
 
     def update():
         with store.transaction() as trans:
@@ -100,9 +140,9 @@ def test_update_many_speed_in_transaction(store):
     assert len(updated) == count
 
 
-def test_query_speed(store):
-    count = 10000
-    records = randdicts(count)
+def test_query_speed(store, bulk_records):
+    records = copy_records(bulk_records)
+    count = len(records)
 
     store.create_many(records)
 
@@ -115,7 +155,7 @@ def test_query_speed(store):
                 trans.row.email.desc
             ).execute()
 
-    records, duration = TimeUtils.timed(timed_func)
+    records, duration = best_of(3, timed_func)
 
     print(f'Total time taken: {duration.total_seconds():.3f}')
 
@@ -1,7 +1,9 @@
 from store.constants import OP_CODE
 from store.symbol import Symbol, SymbolicAttribute
 from store.query import Query
-from store.predicate import ConditionalExpression, BooleanExpression
+from store.predicate import (
+    ConditionalExpression, BooleanExpression, ConjunctiveExpression
+)
 from store.ordering import Ordering
 
 
@@ -12,6 +14,8 @@ def test_symbol_adds_attributes():
     assert 'name' in user._attrs
     assert isinstance(user._attrs['name'], SymbolicAttribute)
     assert user.name.symbol is user
+    assert user.name is user._attrs['name']
+    assert user['name'] is user.name
 
 
 def test_comparison_predicates_created():
@@ -50,6 +54,16 @@ def test_comparison_predicates_created():
     assert cmp6.value == 1
 
 
+def test_comparison_predicates_cached():
+    user = Symbol()
+
+    assert (user.name == 'John') is (user.name == 'John')
+    assert (user.name == 'John') is not (user.name != 'John')
+    assert (user.age == 1) is not (user.age == True)
+    assert (user.tags == ([1],)) is (user.tags == ([1],))
+    assert user.name.one_of(['John']) is not user.name.one_of(['John'])
+
+
 def test_logical_operation_created():
     user = Symbol()
 
@@ -182,3 +196,146 @@ def test_query_execute_with_ordering_normal(store_with_data):
     assert len(events) == 2
     assert events[0]['type'] == 'press'
     assert events[1]['type'] == 'click'
+
+
+def test_query_execute_with_multiple_orderings(store):
+    store.create_many([
+        {'id': 1, 'kind': 'fruit', 'name': 'apple'},
+        {'id': 2, 'kind': 'veggie', 'name': 'carrot'},
+        {'id': 3, 'kind': 'fruit', 'name': 'banana'},
+        {'id': 4, 'kind': 'veggie', 'name': 'beet'},
+    ])
+    row = store.row
+
+    query = store.select().order_by(row.kind.asc, row.name.desc)
+    assert list(query()) == [3, 1, 2, 4]
+
+    query = store.select().order_by(row.kind.asc, row.name.asc)
+    assert list(query()) == [1, 3, 4, 2]
+
+
+def test_query_execute_with_inequalities(store):
+    store.create_many([
+        {'id': 1, 'age': 10},
+        {'id': 2, 'age': 20},
+        {'id': 3, 'age': 30},
+        {'id': 4, 'age': None},
+    ])
+    age = store.row.age
+
+    assert set(store.select().where(age < 20)()) == {1}
+    assert set(store.select().where(age <= 20)()) == {1, 2}
+    assert set(store.select().where(age > 20)()) == {3}
+    assert set(store.select().where(age >= 20)()) == {2, 3}
+
+
+def test_query_execute_with_boolean_expressions(store):
+    store.create_many([
+        {'id': 1, 'age': 10, 'name': 'John'},
+        {'id': 2, 'age': 20, 'name': 'Jane'},
+        {'id': 3, 'age': 30, 'name': 'John'},
+    ])
+    row = store.row
+
+    # the selective side is on the right in the first query
+    query = store.select().where((row.age >= 20) & (row.name == 'John'))
+    assert set(query()) == {3}
+    query = store.select().where((row.name == 'John') & (row.age >= 20))
+    assert set(query()) == {3}
+    query = store.select().where((row.age > 20) & (row.nickname == 'Jo'))
+    assert not query()
+    query = store.select().where((row.age > 20) | (row.name == 'Jane'))
+    assert set(query()) == {2, 3}
+
+
+def test_query_execute_with_conjunctive_equalities(store):
+    store.create_many([
+        {'id': 1, 'age': 10, 'name': 'John'},
+        {'id': 2, 'age': 20, 'name': 'John'},
+        {'id': 3, 'age': 20, 'name': 'Jane'},
+    ])
+    row = store.row
+
+    query = store.select().where(row.name == 'John', row.age == 20)
+    assert isinstance(query.predicate, ConjunctiveExpression)
+    assert set(query()) == {2}
+
+    query = store.select().where(row.name == 'John', row.age == 30)
+    assert not query()
+
+    query = store.select().where(row.name == 'John', row.nickname == 'Jo')
+    assert not query()
+
+
+def test_query_execute_with_hash_index(store):
+    store.create_many([
+        {'id': 1, 'age': 10},
+        {'id': 2, 'age': 20},
+        {'id': 3, 'age': None},
+    ])
+    store.create_index('age', kind='hash')
+    store.create({'id': 4, 'age': 30})
+    age = store.row.age
+
+    assert set(store.select().where(age == 20)()) == {2}
+    assert set(store.select().where(age.one_of([10, 30]))()) == {1, 4}
+    assert set(store.select().where(age < 20)()) == {1}
+    assert set(store.select().where(age >= 20)()) == {2, 4}
+
+    # cached sorted keys are invalidated by writes
+    store.create({'id': 5, 'age': 25})
+    store.delete(2)
+    assert set(store.select().where(age >= 20)()) == {4, 5}
+
+
+def test_query_execute_with_mixed_type_keys(store):
+    store.create_index('data', kind='hash')
+    store.create_many([
+        {'id': 1, 'data': {'a': 1, 2: 'b'}},
+        {'id': 2, 'data': {1, 'a'}},
+    ])
+    data = store.row.data
+
+    assert set(store.select().where(data == {2: 'b', 'a': 1})()) == {1}
+    assert set(store.select().where(data == {'a', 1})()) == {2}
+
+
+def test_query_execute_with_mixed_type_keys_in_btree_index(store):
+    store.create_many([
+        {'id': 1, 'data': {'a': 1, 2: 'b'}, 'tags': {1, 'a'}},
+        {'id': 2, 'data': {'a': 2, 2: 'b'}, 'tags': {2, 'a'}},
+        {'id': 3, 'data': {'a': 1, 3: 'b'}, 'tags': {1, 'b'}},
+    ])
+    data = store.row.data
+    tags = store.row.tags
+
+    assert set(store.select().where(data == {2: 'b', 'a': 1})()) == {1}
+    assert set(store.select().where(data == {'a': 2, 2: 'b'})()) == {2}
+    assert set(store.select().where(data == {3: 'b', 'a': 1})()) == {3}
+    assert set(store.select().where(tags == {'a', 1})()) == {1}
+    assert set(store.select().where(tags == {'a', 2})()) == {2}
+    assert set(store.select().where(tags == {'b', 1})()) == {3}
+
+
+def test_query_reuses_compiled_predicate(store):
+    store.create_many([{'id': 1, 'age': 10}, {'id': 2, 'age': 20}])
+    age = store.row.age
+    query = store.select().where(age > 10)
+
+    assert set(query()) == {2}
+    assert query.compile() is query.compile()
+
+    store.create({'id': 3, 'age': 30})
+    assert set(query()) == {2, 3}
+
+    query.where(age < 30)
+    assert set(query()) == {2}
+
+
+def test_query_execute_with_pagination(store):
+    store.create_many([{'id': i, 'age': i} for i in range(10)])
+    query = store.select().order_by(store.row.age.asc)
+
+    assert list(query.limit(3)()) == [0, 1, 2]
+    assert list(query.offset(8)()) == [8, 9]
+    assert list(query.offset(2).limit(3)()) == [2, 3, 4]
@@ -1,3 +1,8 @@
+import pytest
+
+from store.exceptions import NotWritable
+
+
 def test_create_in_transaction(click_event, transaction):
     trans = transaction
     trans.create(click_event)
@@ -11,15 +16,24 @@ def test_create_in_transaction(click_event, transaction):
 def test_create_many_in_transaction(click_event, press_event, transaction):
     trans = transaction
     trans.create_many([click_event, press_event])
+    pkeys = {click_event['id'], press_event['id']}
 
-    for event in [click_event, press_event]:
-        pkey = event['id']
-        assert pkey in trans.front.records
-        assert pkey not in trans.back.records
-
+    assert pkeys <= trans.front.records.keys()
+    assert pkeys.isdisjoint(trans.back.records)
     assert len(trans.created_pkeys) == 2
 
 
+def test_commit_created_in_transaction(store, click_event):
+    with store.transaction() as trans:
+        created = trans.create(click_event)
+
+    pkey = click_event['id']
+    record = store.get(pkey)
+    assert record == created
+    assert record is not created
+    assert set(store.select().where(store.row.type == 'click')()) == {pkey}
+
+
 def test_get_in_transaction(click_event, transaction):
     trans = transaction
     trans.create(click_event)
@@ -34,7 +48,7 @@ def test_get_many_in_transaction(click_event, press_event, transaction):
     trans.create_many([click_event, press_event])
     assert len(trans.created_pkeys) == 2
 
-    records = trans.get_many([click_event['id'], press_event['id']])
+    records = trans.get_many((click_event['id'], press_event['id']))
     assert len(records) == 2
 
 
@@ -53,24 +67,47 @@ def test_select_in_transaction(store):
     assert 'age' in sam
 
 
+def test_select_in_untouched_transaction(store_with_data, click_event):
+    with store_with_data.transaction() as trans:
+        records = trans.select().where(trans.row.type == 'click')()
+
+    assert list(records) == [click_event['id']]
+
+
+def test_select_excludes_touched_in_transaction(store):
+    store.create_many([{'id': i, 'age': i} for i in range(4)])
+    with store.transaction() as trans:
+        trans.delete(0)
+        assert set(trans.select()()) == {1, 2, 3}
+        predicate = trans._get_untouched_predicate()
+        assert trans._get_untouched_predicate() is predicate
+
+        trans.update({'id': 1, 'age': 10})
+        assert set(trans.select().where(trans.row.age < 5)()) == {2, 3}
+
+
 def test_update_in_transaction(store_with_data, click_event, transaction):
     old_x = click_event['position']['x']
     new_x = 1213243
 
-    click_event['position']['x'] = new_x
+    # the fixture is left as-is, and an updated copy is written instead
+    position = dict(click_event['position'], x=new_x)
+    updated_click_event = dict(click_event, position=position)
 
     trans = transaction
     trans.store = store_with_data
 
-    trans.update(click_event)
+    trans.update(updated_click_event)
 
     assert len(trans.updated_pkeys) == 1
 
-    record = trans.front.get(click_event['id'])
+    pkey = click_event['id']
+
+    record = trans.front.get(pkey)
     assert record is not None
     assert record['position']['x'] == new_x
 
-    record = trans.back.get(click_event['id'])
+    record = trans.back.get(pkey)
     assert record['position']['x'] == old_x
 
 
@@ -81,30 +118,32 @@ def test_update_many_in_transaction(store_with_data, click_event, press_event, t
     old_char = press_event['char']
     new_char = 'z'
 
-    click_event['position']['x'] = new_x
-    press_event['char'] = new_char
+    position = dict(click_event['position'], x=new_x)
+    updated_click_event = dict(click_event, position=position)
+    updated_press_event = dict(press_event, char=new_char)
 
     trans = transaction
     trans.store = store_with_data
 
-    trans.update_many([click_event, press_event])
+    trans.update_many([updated_click_event, updated_press_event])
 
     assert len(trans.updated_pkeys) == 2
 
-    record = trans.front.get(click_event['id'])
-    assert record is not None
-    assert record['position']['x'] == new_x
-
-    record = trans.front.get(press_event['id'])
-    assert record is not None
-    assert record['char'] == new_char
+    # compare the front (updated) and back (original) values of each record
+    click_id = click_event['id']
+    press_id = press_event['id']
 
-    record = trans.back.get(click_event['id'])
-    assert record['position']['x'] == old_x
+    click_xs = (
+        trans.front.get(click_id)['position']['x'],
+        trans.back.get(click_id)['position']['x'],
+    )
+    assert click_xs == (new_x, old_x)
 
-    record = trans.back.get(press_event['id'])
-    assert record is not None
-    assert record['char'] == old_char
+    press_chars = (
+        trans.front.get(press_id)['char'],
+        trans.back.get(press_id)['char'],
+    )
+    assert press_chars == (new_char, old_char)
 
 
 def test_delete_in_transaction(store_with_data, click_event, transaction):
@@ -125,7 +164,94 @@ def test_delete_many_in_transaction(store_with_data, click_event, press_event, t
 
     assert len(trans.deleted_pkeys) == 2
 
-    for event in [click_event, press_event]:
-        pkey = event['id']
-        assert pkey not in trans.front
-        assert pkey in trans.back
\ No newline at end of file
+    events = (click_event, press_event)
+    assert all(e['id'] not in trans.front.records for e in events)
+    assert all(e['id'] in trans.back.records for e in events)
+
+
+def test_get_many_from_back_in_transaction(store_with_data, click_event):
+    pkey = click_event['id']
+
+    with store_with_data.transaction() as trans:
+        records = trans.get_many((pkey,))
+        assert records[pkey] is not store_with_data.get(pkey)
+        assert records[pkey].transaction is trans
+
+        records[pkey]['type'] = 'double-click'
+        assert store_with_data.records[pkey]['type'] == 'click'
+
+    assert store_with_data.records[pkey]['type'] == 'double-click'
+
+
+def test_delete_keys_in_transaction(store_with_data, click_event):
+    pkey = click_event['id']
+
+    with store_with_data.transaction() as trans:
+        record = trans.get(pkey)
+        record.delete({'type'})
+
+        assert pkey in trans.updated_pkeys
+        assert store_with_data.records[pkey]['type'] == 'click'
+
+    assert store_with_data.records[pkey]['type'] is None
+
+
+def test_read_only_transaction(store_with_data, click_event):
+    with store_with_data.transaction(read_only=True) as trans:
+        pkey = click_event['id']
+        record = trans.get(pkey)
+        assert record == store_with_data.get(pkey)
+
+        with pytest.raises(NotWritable):
+            trans.update(click_event)
+
+        # writes through its records and queries are rejected, too
+        with pytest.raises(NotWritable):
+            record['type'] = 'double-click'
+        with pytest.raises(NotWritable):
+            trans.select().where(trans.row.type == 'click').delete()
+
+    assert store_with_data.records[pkey]['type'] == 'click'
+    assert trans._front is None
+
+
+def test_transaction_callback(store, click_event, press_event):
+    calls = []
+
+    def callback(trans, created, updated, deleted):
+        calls.append((set(created), set(updated), deleted))
+
+    with store.transaction(callback) as trans:
+        trans.create(click_event)
+        trans.create(press_event)
+        trans.delete(press_event['id'])
+
+    assert calls == [({click_event['id']}, set(), {press_event['id']})]
+
+
+def test_update_missing_record_in_transaction(store_with_data, click_event):
+    pkey = click_event['id']
+
+    with store_with_data.transaction() as trans:
+        with pytest.raises(KeyError):
+            trans.update({'id': 'missing', 'type': 'click'})
+
+        trans.delete(pkey)
+        with pytest.raises(KeyError):
+            trans.update(dict(click_event, type='double-click'))
+
+    assert pkey not in store_with_data.records
+
+
+def test_delete_many_keys_in_transaction(store_with_data, click_event, press_event):
+    pkeys = [click_event['id'], press_event['id']]
+
+    with store_with_data.transaction() as trans:
+        trans.delete_many(pkeys, keys={'type'})
+
+        assert set(pkeys) == trans.updated_pkeys
+        assert not trans.deleted_pkeys
+        assert store_with_data.records[pkeys[0]]['type'] == 'click'
+
+    for pkey in pkeys:
+        assert store_with_data.records[pkey]['type'] is None